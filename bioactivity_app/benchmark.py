@@ -0,0 +1,92 @@
+# python benchmark.py -output benchmark.json
+
+import argparse
+import json
+import platform
+import time
+import timeit
+
+import numpy as np
+import pandas as pd
+
+import data_processing as data
+
+ROWS = 1_000_000
+SEED = 1
+
+
+def pIC50_loop(standard_value: pd.Series) -> list:
+    # row-by-row implementation replaced by data.pIC50_values
+    pIC50_values = []
+    for value in standard_value:
+        value = min(value, data.IC50_MAX_VALUE)
+        value *= (10 ** -9)
+        pIC50_values.append(-np.log10(value))
+    return pIC50_values
+
+
+def bioactivity_class_loop(standard_value: pd.Series) -> list:
+    # row-by-row implementation replaced by data.bioactivity_class_values
+    bioactivity_class = []
+    for value in standard_value:
+        if value >= data.INACTIVE_THRESHOLD:
+            bioactivity_class.append("inactive")
+        elif value <= data.ACTIVE_THRESHOLD:
+            bioactivity_class.append("active")
+        else:
+            bioactivity_class.append("intermediate")
+    return bioactivity_class
+
+
+def _best_time(statement, repeat: int) -> float:
+    return min(timeit.repeat(statement, repeat=repeat, number=1))
+
+
+def compare(name: str, loop, vectorized, standard_value: pd.Series,
+            repeat: int) -> dict:
+    loop_seconds = _best_time(lambda: loop(standard_value), repeat)
+    vectorized_seconds = _best_time(lambda: vectorized(standard_value), repeat)
+    return {"stage": name,
+            "rows": len(standard_value),
+            "loop_seconds": loop_seconds,
+            "vectorized_seconds": vectorized_seconds,
+            "speedup": loop_seconds / vectorized_seconds}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the bioactivity processing stages")
+    parser.add_argument("-output", type=str, default=None,
+                        help="JSON file for the results (default: stdout)")
+    parser.add_argument("-rows", type=int, default=ROWS)
+    parser.add_argument("-repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(SEED)
+    # IC50 values in nM spread over several orders of magnitude
+    standard_value = pd.Series(10 ** rng.uniform(-1, 9, args.rows))
+
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "stages": [
+            compare("convert_to_pIC50", pIC50_loop, data.pIC50_values,
+                    standard_value, args.repeat),
+            compare("add_bioactivity_class", bioactivity_class_loop,
+                    data.bioactivity_class_values, standard_value,
+                    args.repeat),
+        ],
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "wt") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
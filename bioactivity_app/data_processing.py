@@ -1,150 +1,480 @@
 import streamlit as st
 
 import numpy as np
-from numpy.random import seed
+import os
 import time
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, List, Optional
 
 import pandas as pd
 
-from chembl_webresource_client.new_client import new_client
+from data_sources import SQLITE_PATH, SQLiteSource, create_data_source
+from dataset import CODE_VERSION, HASH_FUNCS, Dataset
+from descriptor_store import DescriptorStore
+from descriptors import compute_descriptors
+from exports import EXPORT_FORMATS, export_df
+from jobs import Job, JobRunner, StopJob
+from mann_whitney import mannwhitney_u
+from persistent_cache import PersistentCache, cache_key
+from target_index import TargetIndex
 
-from rdkit import Chem
-from rdkit.Chem import Descriptors, Lipinski
-
-from scipy.stats import mannwhitneyu
-
-SLEEP_TIME = 1
 IC50_MAX_VALUE = 100_000_000
 SEED = 1
+ALPHA = 0.05
+# label permutations of the optional permutation test
+PERMUTATIONS = 10_000
 
-DATAFRAME_COLUMNS_FILTER = [
-    "activity_id", "molecule_chembl_id", "canonical_smiles", "standard_value"]
-
-DESCRIPTOR_FUNCTIONS = {
-    "MW": Descriptors.MolWt,
-    "LogP": Descriptors.MolLogP,
-    "NumHDonors": Lipinski.NumHDonors,
-    "NumHAcceptors": Lipinski.NumHAcceptors
-}
-DEFAULT_DESCRIPTORS = list(DESCRIPTOR_FUNCTIONS.keys())
+# IC50 thresholds in nM: active <= ACTIVE_THRESHOLD, inactive >= INACTIVE_THRESHOLD
+ACTIVE_THRESHOLD = 1_000
+INACTIVE_THRESHOLD = 10_000
+BIOACTIVITY_CLASSES = ["active", "intermediate", "inactive"]
 
+# string columns with fewer distinct values than this share become categorical
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
 
-@st.cache_data
-def convert_df(df: pd.DataFrame) -> bytes:
-    return df.to_csv(index=False).encode("utf-8")
-
-
-@st.cache_data(show_spinner=False)
-def get_targets(user_query: str) -> pd.DataFrame:
-    with st.spinner("Getting data..."):
-        time.sleep(SLEEP_TIME)
-        target = new_client.target
-        target_search_result = target.search(user_query)
-
-        return pd.DataFrame.from_dict(target_search_result)
-
-
-@st.cache_data(show_spinner=False)
-def get_target_bioactivity_data(target_chembl_id: str) -> pd.DataFrame:
-    with st.spinner("Getting data for {}...".format(target_chembl_id)):
-        time.sleep(SLEEP_TIME)
-        activity = new_client.activity
-        activity_search_result = activity.filter(
-            target_chembl_id=target_chembl_id).filter(standard_type="IC50")
-
-        return pd.DataFrame.from_dict(activity_search_result)
-
+DATAFRAME_COLUMNS_FILTER = [
+    "activity_id", "molecule_chembl_id", "canonical_smiles", "standard_value"]
 
-@st.cache_data(show_spinner=False)
-def preprocess_bioactivity_df(df: pd.DataFrame) -> pd.DataFrame:
-    with st.spinner("Preprocessing Bioactivity Data..."):
-        time.sleep(SLEEP_TIME)
+DATA_SOURCE = create_data_source()
 
-        df["standard_value"] = df["standard_value"].astype(float)
+# target search uses a local index of this catalog when it exists, whatever
+# the data source
+TARGET_CATALOG_PATH = os.environ.get("BIOACTIVITY_TARGET_CATALOG_PATH",
+                                     SQLITE_PATH)
+# best matches of the local index shown for a query
+TARGET_SEARCH_LIMIT = 100
 
-        # remove nans, negative IC50 values, remove unused fields
-        df = df[df.standard_value.notna()]
-        df = df[df.standard_value >= 0]
-        df = df[DATAFRAME_COLUMNS_FILTER]
-        return df.reset_index(drop=True)
+# survives restarts and is shared by all app processes on the host
+PERSISTENT_CACHE = PersistentCache()
+DESCRIPTOR_STORE = DescriptorStore()
 
+# stored bioactivity records older than this are refreshed incrementally
+REFRESH_INTERVAL = float(os.environ.get("BIOACTIVITY_REFRESH_INTERVAL",
+                                        24 * 60 * 60))
 
-@st.cache_data(show_spinner=False)
-def convert_to_pIC50(df: pd.DataFrame) -> pd.DataFrame:
-    pIC50_values = []
-    for value in df["standard_value"]:
-        value = min(value, IC50_MAX_VALUE)  # filter out big IC50 values
-        value *= (10 ** -9)  # nM to M
-        pIC50_values.append(-np.log10(value))
+# concurrent requests to the data source when comparing several targets
+TARGET_WORKERS = int(os.environ.get("BIOACTIVITY_TARGET_WORKERS", 4))
 
-    df["pIC50"] = pIC50_values
-    return df.drop(labels="standard_value", axis=1)
+# pipelines running in the background, shared by all sessions
+JOB_WORKERS = int(os.environ.get("BIOACTIVITY_JOB_WORKERS", 2))
+JOB_HISTORY = 32
+JOB_MAX_AGE = 60 * 60
+# pipeline results kept by finished jobs
+KEPT_STAGES = ["bioactivity_data", "compacted", "mannwhitney"]
 
+# comparisons of several targets kept for reruns and other sessions
+COMPARISON_CACHE_MAX_ENTRIES = 8
 
-@st.cache_data(show_spinner=False)
-def mannwhitney_u_test(df: pd.DataFrame, descriptor: str) -> pd.DataFrame:
-    seed(SEED)
+# stage results are shared, not copied, and looked up by lineage key. Each
+# entry pins a dataset, so they are only kept for about as long as a job
+STAGE_CACHE_MAX_ENTRIES = 16
+STAGE_CACHE_TTL = JOB_MAX_AGE
 
-    active = df[df.bioactivity_class == "active"][descriptor]
-    inactive = df[df.bioactivity_class == "inactive"][descriptor]
 
-    statistic, p_value = mannwhitneyu(active, inactive)
+def export_dataset(dataset: Dataset, export_format: str) -> BinaryIO:
+    # built when a download is requested, and not kept
+    return export_df(dataset.df, export_format)
 
-    alpha = 0.05
-    if p_value > alpha:
-        interpretation = "Same distribution (fail to reject H0)"
-    else:
-        interpretation = "Different distribution (reject H0)"
 
-    return pd.DataFrame.from_dict({"Descriptor": [descriptor],
-                                   "Statistics": [statistic],
-                                   "P-value": [p_value],
-                                   "α": [alpha],
-                                   "Interpretation": [interpretation]})
+@st.cache_resource(show_spinner=False)
+def get_target_index() -> Optional[TargetIndex]:
+    if not os.path.exists(TARGET_CATALOG_PATH):
+        return None
+    index = SQLiteSource(TARGET_CATALOG_PATH).target_index()
+    return index if len(index.targets) else None
 
 
 @st.cache_data(show_spinner=False)
-def add_bioactivity_class(df: pd.DataFrame, remove_intermediate: bool = True
-                          ) -> pd.DataFrame:
-    with st.spinner("Adding bioactivity class..."):
-        time.sleep(SLEEP_TIME)
-
-        bioactivity_class = []
-        for value in df["standard_value"]:
-            if value >= 10000:
-                bioactivity_class.append("inactive")
-            elif value <= 1000:
-                bioactivity_class.append("active")
-            else:
-                bioactivity_class.append("intermediate")
-
-        df["bioactivity_class"] = bioactivity_class
-
-        if remove_intermediate:
-            df = df[df.bioactivity_class != "intermediate"]
-
-        return df.reset_index(drop=True)
+def get_targets(user_query: str) -> pd.DataFrame:
+    index = get_target_index()
+    if index is not None:
+        return index.search(user_query, TARGET_SEARCH_LIMIT)
 
+    key = cache_key("targets", DATA_SOURCE.name, user_query)
+    targets = PERSISTENT_CACHE.get(key)
+    if targets is not None:
+        return targets
 
-@st.cache_data(show_spinner=False)
-def add_lipinski_descriptors(df: pd.DataFrame,
+    with st.spinner("Getting data..."):
+        targets = DATA_SOURCE.search_targets(user_query)
+        PERSISTENT_CACHE.put(key, targets)
+        return targets
+
+
+def _watermark(bioactivity: pd.DataFrame) -> Optional[int]:
+    # highest activity_id already stored for the target
+    if "activity_id" not in bioactivity.columns or bioactivity.empty:
+        return None
+    return int(bioactivity["activity_id"].max())
+
+
+def _bioactivity_key(target_chembl_id: str) -> str:
+    return cache_key("bioactivity", DATA_SOURCE.name, target_chembl_id, "IC50")
+
+
+def _fetched_at(target_chembl_id: str) -> Optional[float]:
+    # when the stored records were last fetched, None when there are none or
+    # they are due for a refresh
+    fetched = PERSISTENT_CACHE.refreshed_at(_bioactivity_key(target_chembl_id))
+    if fetched is None or time.time() - fetched >= REFRESH_INTERVAL:
+        return None
+    return fetched
+
+
+def fetch_bioactivity_data(target_chembl_id: str) -> Dataset:
+    """Bioactivity records of a target, from the persistent cache if stored.
+
+    Stored records older than REFRESH_INTERVAL are refreshed incrementally:
+    only records with an activity_id above the stored watermark are fetched
+    and appended. The result is then a concatenation of the stored and the
+    new records, so row by row stages only process the new ones.
+
+    Refreshes do not postpone the expiry of the stored records, so all of
+    them are fetched again CACHE_TTL after the last full fetch, picking up
+    records changed or removed upstream below the watermark.
+    """
+    query = ("bioactivity", DATA_SOURCE.name, target_chembl_id, "IC50")
+    key = _bioactivity_key(target_chembl_id)
+    bioactivity, age = PERSISTENT_CACHE.get_with_age(key)
+    if bioactivity is not None and age < REFRESH_INTERVAL:
+        return Dataset.from_source(bioactivity, *query,
+                                   _watermark(bioactivity))
+
+    # without a watermark (nothing stored, or no records) there is nothing
+    # to continue from
+    watermark = None if bioactivity is None else _watermark(bioactivity)
+    if watermark is None:
+        bioactivity = DATA_SOURCE.get_activities(target_chembl_id, "IC50")
+        PERSISTENT_CACHE.put(key, bioactivity)
+        return Dataset.from_source(bioactivity, *query,
+                                   _watermark(bioactivity))
+
+    dataset = Dataset.from_source(bioactivity, *query, watermark)
+    new_bioactivity = DATA_SOURCE.get_activities(
+        target_chembl_id, "IC50", after_activity_id=watermark)
+    if new_bioactivity.empty:
+        PERSISTENT_CACHE.touch(key)
+        return dataset
+
+    bioactivity = Dataset.concat(
+        [dataset, Dataset.from_source(new_bioactivity, *query, "after",
+                                      watermark)])
+    PERSISTENT_CACHE.put(key, bioactivity.df, keep_created=True)
+    return bioactivity
+
+
+@st.cache_resource(show_spinner=False, hash_funcs=HASH_FUNCS,
+                   max_entries=STAGE_CACHE_MAX_ENTRIES, ttl=STAGE_CACHE_TTL)
+def preprocess_bioactivity_df(dataset: Dataset) -> Dataset:
+    if dataset.parts is not None:
+        return Dataset.concat([preprocess_bioactivity_df(part)
+                               for part in dataset.parts])
+
+    df = dataset.df.assign(
+        standard_value=dataset.df["standard_value"].astype(float))
+
+    # remove nans, negative IC50 values, remove unused fields
+    df = df[df.standard_value.notna()]
+    df = df[df.standard_value >= 0]
+    df = df[DATAFRAME_COLUMNS_FILTER]
+    return dataset.derive("preprocess", df.reset_index(drop=True))
+
+
+def pIC50_values(standard_value: pd.Series,
+                 ic50_max_value: float = IC50_MAX_VALUE) -> np.ndarray:
+    values = np.minimum(standard_value.to_numpy(dtype=float),
+                        ic50_max_value)  # filter out big IC50 values
+    with np.errstate(divide="ignore"):
+        return -np.log10(values * 1e-9)  # nM to M
+
+
+def bioactivity_class_values(standard_value: pd.Series,
+                             active_threshold: float = ACTIVE_THRESHOLD,
+                             inactive_threshold: float = INACTIVE_THRESHOLD
+                             ) -> pd.Categorical:
+    values = standard_value.to_numpy(dtype=float)
+    codes = np.select(
+        [values >= inactive_threshold, values <= active_threshold],
+        [BIOACTIVITY_CLASSES.index("inactive"),
+         BIOACTIVITY_CLASSES.index("active")],
+        BIOACTIVITY_CLASSES.index("intermediate")).astype(np.int8)
+    return pd.Categorical.from_codes(codes, BIOACTIVITY_CLASSES)
+
+
+@st.cache_resource(show_spinner=False, hash_funcs=HASH_FUNCS,
+                   max_entries=STAGE_CACHE_MAX_ENTRIES, ttl=STAGE_CACHE_TTL)
+def convert_to_pIC50(dataset: Dataset, ic50_max_value: float = IC50_MAX_VALUE
+                     ) -> Dataset:
+    if dataset.parts is not None:
+        return Dataset.concat([convert_to_pIC50(part, ic50_max_value)
+                               for part in dataset.parts])
+
+    df = dataset.df.assign(
+        pIC50=pIC50_values(dataset.df["standard_value"], ic50_max_value))
+    df = df.drop(labels="standard_value", axis=1).reset_index(drop=True)
+    return dataset.derive("pIC50", df, ic50_max_value=ic50_max_value)
+
+
+@st.cache_data(show_spinner=False, hash_funcs=HASH_FUNCS,
+               max_entries=STAGE_CACHE_MAX_ENTRIES)
+def mannwhitney_u_tests(dataset: Dataset, descriptors: List[str],
+                        permutations: int = 0, seed: int = SEED
+                        ) -> pd.DataFrame:
+    df = dataset.df
+    active = df.bioactivity_class == "active"
+    inactive = df.bioactivity_class == "inactive"
+
+    # molecules whose descriptors could not be computed are NaN
+    values = df[descriptors].to_numpy(dtype=float)
+    statistics, p_values = mannwhitney_u(
+        values[active.to_numpy()], values[inactive.to_numpy()],
+        permutations=permutations, rng=np.random.default_rng(seed))
+
+    interpretation = np.where(p_values > ALPHA,
+                              "Same distribution (fail to reject H0)",
+                              "Different distribution (reject H0)")
+    interpretation[np.isnan(p_values)] = "Not enough data"
+
+    return pd.DataFrame({"Descriptor": descriptors,
+                         "Statistics": statistics,
+                         "P-value": p_values,
+                         "α": ALPHA,
+                         "Interpretation": interpretation})
+
+
+@st.cache_resource(show_spinner=False, hash_funcs=HASH_FUNCS,
+                   max_entries=STAGE_CACHE_MAX_ENTRIES, ttl=STAGE_CACHE_TTL)
+def add_bioactivity_class(dataset: Dataset, remove_intermediate: bool = True,
+                          active_threshold: float = ACTIVE_THRESHOLD,
+                          inactive_threshold: float = INACTIVE_THRESHOLD
+                          ) -> Dataset:
+    if dataset.parts is not None:
+        return Dataset.concat([add_bioactivity_class(
+            part, remove_intermediate, active_threshold, inactive_threshold)
+            for part in dataset.parts])
+
+    df = dataset.df.assign(bioactivity_class=bioactivity_class_values(
+        dataset.df["standard_value"], active_threshold, inactive_threshold))
+
+    if remove_intermediate:
+        df = df[df.bioactivity_class != "intermediate"]
+        df = df.assign(bioactivity_class=df[
+            "bioactivity_class"].cat.remove_unused_categories())
+
+    return dataset.derive(
+        "bioactivity_class", df.reset_index(drop=True),
+        remove_intermediate=remove_intermediate,
+        active_threshold=active_threshold,
+        inactive_threshold=inactive_threshold)
+
+
+@st.cache_resource(show_spinner=False, hash_funcs=HASH_FUNCS,
+                   max_entries=STAGE_CACHE_MAX_ENTRIES, ttl=STAGE_CACHE_TTL)
+def add_lipinski_descriptors(dataset: Dataset,
                              descriptor_names: Optional[List[str]]
-                             ) -> pd.DataFrame:
-    with st.spinner("Adding Lipinski Descriptors.."):
-        time.sleep(SLEEP_TIME)
+                             ) -> Dataset:
+    if dataset.parts is not None:
+        return Dataset.concat([add_lipinski_descriptors(part, descriptor_names)
+                               for part in dataset.parts])
+
+    descriptors = compute_descriptors(dataset.df["canonical_smiles"],
+                                      descriptor_names, store=DESCRIPTOR_STORE)
+    df = dataset.df.assign(**descriptors)
+
+    return dataset.derive("lipinski_descriptors", df.reset_index(drop=True),
+                          descriptor_names=descriptor_names)
+
+
+def _compact_column(column: pd.Series) -> pd.Series:
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column
+
+    if pd.api.types.is_float_dtype(column.dtype):
+        values = column.to_numpy()
+        if not np.isnan(values).any() and np.array_equal(
+                values, np.round(values)):
+            return pd.to_numeric(column, downcast="integer")
+        float32_values = values.astype(np.float32)
+        if np.array_equal(float32_values, values, equal_nan=True):
+            return column.astype(np.float32)
+        return column
+
+    if pd.api.types.is_integer_dtype(column.dtype):
+        return pd.to_numeric(column, downcast="integer")
+
+    if pd.api.types.is_object_dtype(column.dtype) or \
+            pd.api.types.is_string_dtype(column.dtype):
+        if not column.map(lambda value: isinstance(value, str) or
+                          value is None or value != value).all():
+            return column
+        if column.nunique() <= CATEGORY_MAX_UNIQUE_RATIO * len(column):
+            return column.astype("category")
+        return column.astype(pd.StringDtype("pyarrow"))
+
+    return column
+
+
+def compact_bioactivity_df(df: pd.DataFrame) -> tuple:
+    """Smaller in-memory representation of a processed dataset.
+
+    Repeated strings become categoricals, other strings Arrow-backed strings,
+    and numeric columns are downcast to small ints or float32 only where the
+    values survive the conversion unchanged. Returns the compacted frame and
+    the number of bytes saved.
+    """
+    compacted = pd.DataFrame({name: _compact_column(df[name])
+                              for name in df.columns}, index=df.index)
+    saved_bytes = (df.memory_usage(deep=True).sum() -
+                   compacted.memory_usage(deep=True).sum())
+    return compacted, int(saved_bytes)
+
+
+@st.cache_resource(show_spinner=False, hash_funcs=HASH_FUNCS,
+                   max_entries=STAGE_CACHE_MAX_ENTRIES, ttl=STAGE_CACHE_TTL)
+def compact_bioactivity_data(dataset: Dataset) -> tuple:
+    df, saved_bytes = compact_bioactivity_df(dataset.df)
+    return dataset.derive("compact", df), saved_bytes
+
+
+def _target_summary(target_chembl_id: str, dataset: Dataset,
+                    mannwhitney_df: pd.DataFrame) -> dict:
+    df = dataset.df
+    summary = {"target_chembl_id": target_chembl_id,
+               "Compounds": df["molecule_chembl_id"].nunique(),
+               "Active": int((df.bioactivity_class == "active").sum()),
+               "Inactive": int((df.bioactivity_class == "inactive").sum()),
+               "Median pIC50": df["pIC50"].median()}
+    for descriptor, p_value in zip(mannwhitney_df["Descriptor"],
+                                   mannwhitney_df["P-value"]):
+        summary["P-value " + descriptor] = p_value
+    return summary
+
+
+def analyze_targets(target_chembl_ids: List[str],
+                    descriptor_names: List[str],
+                    test_descriptors: List[str],
+                    workers: int = TARGET_WORKERS) -> tuple:
+    """Runs the pipeline for several targets and compares them.
+
+    Bioactivity data is fetched for up to `workers` targets at a time.
+    Descriptors of the molecules of all targets are computed together, so
+    the process pool of compute_descriptors is used once and molecules
+    shared between targets are described once. Returns a summary table
+    with one row per target and the processed rows of all targets with
+    their target_chembl_id, for plotting.
+    """
+    with st.spinner("Getting data for {} targets...".format(
+            len(target_chembl_ids))):
+        with ThreadPoolExecutor(
+                max_workers=max(1, min(workers, len(target_chembl_ids)))
+        ) as executor:
+            datasets = list(executor.map(fetch_bioactivity_data,
+                                         target_chembl_ids))
+    return _analyze_targets(tuple(target_chembl_ids), tuple(datasets),
+                            tuple(descriptor_names), tuple(test_descriptors),
+                            CODE_VERSION)
+
+
+# comparisons are shared by reruns and sessions while their records are
+# unchanged, the datasets are hashed by their lineage keys
+@st.cache_resource(show_spinner=False, hash_funcs=HASH_FUNCS,
+                   ttl=REFRESH_INTERVAL,
+                   max_entries=COMPARISON_CACHE_MAX_ENTRIES)
+def _analyze_targets(target_chembl_ids: tuple, datasets: tuple,
+                     descriptor_names: tuple, test_descriptors: tuple,
+                     code_version: str) -> tuple:
+    # targets without any records only get a summary row
+    datasets = [None if dataset.df.empty else convert_to_pIC50(
+        add_bioactivity_class(preprocess_bioactivity_df(dataset)))
+        for dataset in datasets]
+    found = [dataset for dataset in datasets if dataset is not None]
 
-        if not descriptor_names:
-            descriptor_names = DEFAULT_DESCRIPTORS
-        descriptors = {name: [] for name in descriptor_names}
-
-        for smile in df["canonical_smiles"]:
-            molecule = Chem.MolFromSmiles(smile)
-            for descriptor_name in descriptor_names:
-                descriptors[descriptor_name].append(
-                    DESCRIPTOR_FUNCTIONS[descriptor_name](molecule))
-
-        for descriptor_name in descriptor_names:
-            df[descriptor_name] = descriptors[descriptor_name]
-
-    return df.reset_index(drop=True)
+    with st.spinner("Adding Lipinski Descriptors.."):
+        # fills DESCRIPTOR_STORE, the per target stage below reads from it
+        if found:
+            smiles = pd.concat([dataset.df["canonical_smiles"]
+                                for dataset in found], ignore_index=True)
+            compute_descriptors(smiles.drop_duplicates(), descriptor_names,
+                                store=DESCRIPTOR_STORE)
+
+    descriptor_names, test_descriptors = (list(descriptor_names),
+                                          list(test_descriptors))
+    summaries, frames = [], []
+    for target_chembl_id, dataset in zip(target_chembl_ids, datasets):
+        if dataset is None:
+            summaries.append({"target_chembl_id": target_chembl_id,
+                              "Compounds": 0})
+            continue
+        dataset, _ = compact_bioactivity_data(
+            add_lipinski_descriptors(dataset, descriptor_names))
+        summaries.append(_target_summary(
+            target_chembl_id, dataset,
+            mannwhitney_u_tests(dataset, test_descriptors)))
+        frames.append(dataset.df[["bioactivity_class"] + test_descriptors]
+                      .assign(target_chembl_id=target_chembl_id))
+
+    combined = pd.concat(frames, ignore_index=True) if frames else (
+        pd.DataFrame(columns=["bioactivity_class"] + test_descriptors +
+                     ["target_chembl_id"]))
+    combined["bioactivity_class"] = combined["bioactivity_class"].astype(
+        pd.CategoricalDtype(BIOACTIVITY_CLASSES))
+    return pd.DataFrame(summaries), combined
+
+
+@st.cache_resource
+def get_job_runner() -> JobRunner:
+    return JobRunner(JOB_WORKERS, JOB_HISTORY, JOB_MAX_AGE)
+
+
+def _require_records(dataset: Dataset) -> Dataset:
+    # the later stages need records, and their columns
+    if dataset.df.empty:
+        raise StopJob("No bioactivity data")
+    return dataset
+
+
+def run_target_pipeline(target_chembl_id: str, descriptor_names: List[str],
+                        test_descriptors: List[str], permutations: int = 0,
+                        retry: bool = False) -> Job:
+    """The background job processing the bioactivity data of a target.
+
+    Stages run off the script thread: bioactivity_data, preprocessed,
+    bioactivity_class, pIC50, lipinski_descriptors, compacted (dataset and
+    saved bytes) and mannwhitney. Only the results the app shows are kept
+    by the job, the intermediate datasets are not. A target without records
+    ends the job after bioactivity_data, see Job.stopped. Identical requests
+    for the same stored records, from any session, share one job, also when
+    it failed unless `retry` is set.
+    """
+    def pipeline_key(fetched: Optional[float]) -> str:
+        # the fetch time changes with the stored records
+        return cache_key("pipeline", DATA_SOURCE.name, target_chembl_id,
+                         descriptor_names, test_descriptors, permutations,
+                         fetched, CODE_VERSION)
+
+    runner = get_job_runner()
+    key = pipeline_key(_fetched_at(target_chembl_id))
+
+    def fetch(results: dict) -> Dataset:
+        dataset = fetch_bioactivity_data(target_chembl_id)
+        # requests made after the fetch get this job too
+        runner.alias(key, pipeline_key(_fetched_at(target_chembl_id)))
+        return dataset
+
+    stages = [
+        ("bioactivity_data", fetch),
+        ("preprocessed", lambda results: preprocess_bioactivity_df(
+            _require_records(results["bioactivity_data"]))),
+        ("bioactivity_class", lambda results: add_bioactivity_class(
+            results["preprocessed"])),
+        ("pIC50", lambda results: convert_to_pIC50(
+            results["bioactivity_class"])),
+        ("lipinski_descriptors", lambda results: add_lipinski_descriptors(
+            results["pIC50"], descriptor_names)),
+        ("compacted", lambda results: compact_bioactivity_data(
+            results["lipinski_descriptors"])),
+        ("mannwhitney", lambda results: mannwhitney_u_tests(
+            results["compacted"][0], test_descriptors,
+            permutations=permutations)),
+    ]
+    return runner.submit(key, stages, KEPT_STAGES, retry)
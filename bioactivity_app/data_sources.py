@@ -0,0 +1,283 @@
+# python data_sources.py -output chembl_subset.sqlite -chembl_dump chembl_35.db
+# python data_sources.py -output chembl_subset.sqlite -targets_file targets.csv \
+#     -activities_file activities.csv
+
+import argparse
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+import pandas as pd
+
+from target_index import TargetIndex
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DATA_SOURCE = os.environ.get("BIOACTIVITY_DATA_SOURCE", "web")
+SQLITE_PATH = os.environ.get(
+    "BIOACTIVITY_SQLITE_PATH", os.path.join(APP_DIR, "chembl_subset.sqlite"))
+
+TARGET_COLUMNS = [
+    "target_chembl_id", "pref_name", "organism", "target_type", "synonyms"]
+ACTIVITY_COLUMNS = [
+    "activity_id", "target_chembl_id", "standard_type", "molecule_chembl_id",
+    "canonical_smiles", "standard_relation", "standard_value",
+    "standard_units"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS targets (
+    target_chembl_id TEXT PRIMARY KEY,
+    pref_name TEXT,
+    organism TEXT,
+    target_type TEXT,
+    synonyms TEXT
+);
+CREATE TABLE IF NOT EXISTS activities (
+    activity_id INTEGER PRIMARY KEY,
+    target_chembl_id TEXT NOT NULL,
+    standard_type TEXT,
+    molecule_chembl_id TEXT,
+    canonical_smiles TEXT,
+    standard_relation TEXT,
+    standard_value REAL,
+    standard_units TEXT
+);
+CREATE INDEX IF NOT EXISTS activities_target_type
+    ON activities (target_chembl_id, standard_type);
+"""
+
+# Copies a subset of a ChEMBL SQLite dump (attached as "chembl") into the
+# local schema. {targets_filter} restricts the target ChEMBL ids.
+CHEMBL_DUMP_TARGETS_QUERY = """
+INSERT OR REPLACE INTO targets
+SELECT td.chembl_id, td.pref_name, td.organism, td.target_type,
+       (SELECT GROUP_CONCAT(DISTINCT cs.component_synonym)
+        FROM chembl.target_components tc
+        JOIN chembl.component_synonyms cs
+            ON cs.component_id = tc.component_id
+        WHERE tc.tid = td.tid)
+FROM chembl.target_dictionary td
+WHERE 1 {targets_filter}
+"""
+CHEMBL_DUMP_ACTIVITIES_QUERY = """
+INSERT OR REPLACE INTO activities
+SELECT act.activity_id, td.chembl_id, act.standard_type, md.chembl_id,
+       cs.canonical_smiles, act.standard_relation, act.standard_value,
+       act.standard_units
+FROM chembl.activities act
+JOIN chembl.assays a ON a.assay_id = act.assay_id
+JOIN chembl.target_dictionary td ON td.tid = a.tid
+JOIN chembl.molecule_dictionary md ON md.molregno = act.molregno
+LEFT JOIN chembl.compound_structures cs ON cs.molregno = act.molregno
+WHERE act.standard_type IN ({standard_types}) {targets_filter}
+"""
+
+
+class DataSource(ABC):
+    """Where target search results and bioactivity records come from."""
+
+    name = ""
+
+    @abstractmethod
+    def search_targets(self, query: str) -> pd.DataFrame:
+        pass
+
+    @abstractmethod
+    def get_activities(self, target_chembl_id: str,
+                       standard_type: str = "IC50",
+                       after_activity_id: Optional[int] = None
+                       ) -> pd.DataFrame:
+        # only records with a larger activity_id when after_activity_id is set
+        pass
+
+
+class ChemblWebSource(DataSource):
+    name = "web"
+
+    @staticmethod
+    def _client():
+        # importing the client fetches the API description from ChEMBL, so it
+        # is deferred until the web source is actually used
+        from chembl_webresource_client.new_client import new_client
+        return new_client
+
+    def search_targets(self, query: str) -> pd.DataFrame:
+        return pd.DataFrame.from_dict(self._client().target.search(query))
+
+    def get_activities(self, target_chembl_id: str,
+                       standard_type: str = "IC50",
+                       after_activity_id: Optional[int] = None
+                       ) -> pd.DataFrame:
+        activity_search_result = self._client().activity.filter(
+            target_chembl_id=target_chembl_id).filter(
+            standard_type=standard_type)
+        if after_activity_id is not None:
+            activity_search_result = activity_search_result.filter(
+                activity_id__gt=after_activity_id)
+        activities = pd.DataFrame.from_dict(activity_search_result)
+        if activities.empty:
+            # from_dict of no records has no columns at all
+            return pd.DataFrame(columns=ACTIVITY_COLUMNS)
+        return activities
+
+
+class SQLiteSource(DataSource):
+    """Local ChEMBL subset indexed on target_chembl_id and standard_type.
+
+    Reading requires the database file to exist; it is only created, with
+    its schema, by the load_* methods.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str = SQLITE_PATH):
+        self.path = path
+        self._target_index = None
+
+    def _connect(self, create: bool = False) -> sqlite3.Connection:
+        if create:
+            connection = sqlite3.connect(self.path)
+            connection.executescript(SCHEMA)
+            return connection
+
+        # connecting would silently create an empty database instead
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(
+                "No local ChEMBL subset at {}, build it with "
+                "data_sources.py".format(self.path))
+        return sqlite3.connect(self.path)
+
+    def get_all_targets(self) -> pd.DataFrame:
+        connection = self._connect()
+        try:
+            return pd.read_sql_query(
+                "SELECT {} FROM targets".format(", ".join(TARGET_COLUMNS)),
+                connection)
+        finally:
+            connection.close()
+
+    def target_index(self) -> TargetIndex:
+        # built on first use and after loading new data
+        if self._target_index is None:
+            self._target_index = TargetIndex(self.get_all_targets())
+        return self._target_index
+
+    def search_targets(self, query: str) -> pd.DataFrame:
+        return self.target_index().search(query)
+
+    def get_activities(self, target_chembl_id: str,
+                       standard_type: str = "IC50",
+                       after_activity_id: Optional[int] = None
+                       ) -> pd.DataFrame:
+        connection = self._connect()
+        try:
+            return pd.read_sql_query(
+                """SELECT * FROM activities
+                   WHERE target_chembl_id = ? AND standard_type = ?
+                       AND activity_id > ?
+                   ORDER BY activity_id""",
+                connection, params=(
+                    target_chembl_id, standard_type,
+                    -1 if after_activity_id is None else after_activity_id))
+        finally:
+            connection.close()
+
+    def load_frames(self, targets: Optional[pd.DataFrame] = None,
+                    activities: Optional[pd.DataFrame] = None):
+        # load an exported subset, e.g. frames returned by ChemblWebSource
+        self._target_index = None
+        connection = self._connect(create=True)
+        try:
+            with connection:
+                for table, df, columns in (
+                        ("targets", targets, TARGET_COLUMNS),
+                        ("activities", activities, ACTIVITY_COLUMNS)):
+                    if df is None:
+                        continue
+                    df = df.reindex(columns=columns)
+                    if table == "targets":
+                        df["synonyms"] = df["synonyms"].map(_synonyms_text)
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO {} VALUES ({})".format(
+                            table, ", ".join("?" * len(columns))),
+                        df.astype(object).where(df.notna(), None).itertuples(
+                            index=False, name=None))
+        finally:
+            connection.close()
+
+    def load_chembl_dump(self, chembl_dump_path: str,
+                         target_chembl_ids: Optional[List[str]] = None,
+                         standard_types: tuple = ("IC50",)):
+        targets_filter, params = "", []
+        if target_chembl_ids:
+            targets_filter = "AND td.chembl_id IN ({})".format(
+                ", ".join("?" * len(target_chembl_ids)))
+            params = list(target_chembl_ids)
+
+        self._target_index = None
+        connection = self._connect(create=True)
+        try:
+            connection.execute("ATTACH DATABASE ? AS chembl",
+                               (chembl_dump_path,))
+            with connection:
+                connection.execute(CHEMBL_DUMP_TARGETS_QUERY.format(
+                    targets_filter=targets_filter), params)
+                connection.execute(CHEMBL_DUMP_ACTIVITIES_QUERY.format(
+                    standard_types=", ".join("?" * len(standard_types)),
+                    targets_filter=targets_filter),
+                    list(standard_types) + params)
+        finally:
+            connection.close()
+
+
+def _synonyms_text(synonyms) -> Optional[str]:
+    # the web client returns synonyms as a list of dicts
+    if isinstance(synonyms, list):
+        return ",".join(item["component_synonym"] if isinstance(item, dict)
+                        else str(item) for item in synonyms)
+    if synonyms is None or synonyms != synonyms:
+        return None
+    return str(synonyms)
+
+
+def _read_table(path: str) -> pd.DataFrame:
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def create_data_source(name: str = DATA_SOURCE) -> DataSource:
+    if name == ChemblWebSource.name:
+        return ChemblWebSource()
+    if name == SQLiteSource.name:
+        return SQLiteSource()
+    raise ValueError("Unknown data source: {}".format(name))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the local SQLite ChEMBL subset")
+    parser.add_argument("-output", type=str, default=SQLITE_PATH)
+    parser.add_argument("-chembl_dump", type=str, default=None,
+                        help="path to a ChEMBL SQLite dump")
+    parser.add_argument("-targets", type=str, nargs="*", default=None,
+                        help="target ChEMBL ids to copy (default: all)")
+    parser.add_argument("-targets_file", type=str, default=None,
+                        help="exported targets, CSV or Parquet")
+    parser.add_argument("-activities_file", type=str, default=None,
+                        help="exported activities, CSV or Parquet")
+    args = parser.parse_args()
+
+    source = SQLiteSource(args.output)
+    if args.chembl_dump:
+        source.load_chembl_dump(args.chembl_dump, args.targets)
+    if args.targets_file or args.activities_file:
+        source.load_frames(
+            _read_table(args.targets_file) if args.targets_file else None,
+            _read_table(args.activities_file) if args.activities_file
+            else None)
+
+
+if __name__ == "__main__":
+    main()
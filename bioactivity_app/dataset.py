@@ -0,0 +1,80 @@
+import hashlib
+import os
+from typing import List, Optional
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from persistent_cache import APP_DIR, cache_key
+
+# every module that shapes a cached result; any change to them changes the
+# lineage key of every dataset
+PIPELINE_MODULES = ["data_processing.py", "data_sources.py", "dataset.py",
+                    "descriptor_store.py", "descriptors.py", "exports.py",
+                    "mann_whitney.py"]
+
+
+def _code_version() -> str:
+    digest = hashlib.sha256()
+    for module in PIPELINE_MODULES:
+        with open(os.path.join(APP_DIR, module), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+CODE_VERSION = _code_version()
+
+
+def source_key(*query) -> str:
+    return cache_key("source", *query)
+
+
+def content_hash(df: pd.DataFrame) -> str:
+    return hashlib.sha256(pd.util.hash_pandas_object(
+        df, index=False).to_numpy().tobytes()).hexdigest()
+
+
+class Dataset:
+    """A DataFrame together with the lineage key of how it was produced.
+
+    The key is built from the source query and a hash of the records, then
+    from the name and
+    parameters of every stage applied and the pipeline code version, so
+    two handles with the same key hold the same data. Cached stages hash a
+    handle by its key only, which makes lookups independent of the size of
+    the frame. Stages must not modify `df` in place.
+
+    A dataset made by `concat` keeps its `parts`, so stages that work row
+    by row can process each part on its own and reuse cached results of
+    the parts they have seen before.
+    """
+
+    def __init__(self, df: pd.DataFrame, key: str,
+                 parts: Optional[List["Dataset"]] = None):
+        self.df = df
+        self.key = key
+        self.parts = parts
+
+    @classmethod
+    def from_source(cls, df: pd.DataFrame, *query) -> "Dataset":
+        return cls(df, source_key(*query, content_hash(df)))
+
+    @classmethod
+    def concat(cls, parts: List["Dataset"], key: Optional[str] = None
+               ) -> "Dataset":
+        df = pd.concat([part.df for part in parts], ignore_index=True)
+        # categories may differ between the parts
+        for name in df.columns:
+            columns = [part.df[name] for part in parts]
+            if all(isinstance(column.dtype, pd.CategoricalDtype)
+                   for column in columns):
+                df[name] = union_categoricals(columns)
+        if key is None:
+            key = cache_key("concat", *[part.key for part in parts])
+        return cls(df, key, parts)
+
+    def derive(self, stage: str, df: pd.DataFrame, **params) -> "Dataset":
+        return Dataset(df, cache_key(self.key, stage, params, CODE_VERSION))
+
+
+HASH_FUNCS = {Dataset: lambda dataset: dataset.key}
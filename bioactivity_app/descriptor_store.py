@@ -0,0 +1,109 @@
+import hashlib
+import os
+import sqlite3
+from typing import List
+
+import numpy as np
+
+from persistent_cache import APP_DIR, SQLITE_TIMEOUT
+
+DESCRIPTOR_STORE_PATH = os.environ.get(
+    "BIOACTIVITY_DESCRIPTOR_STORE_PATH",
+    os.path.join(APP_DIR, ".cache", "descriptors.sqlite"))
+
+
+def smiles_hash(smiles: str) -> str:
+    return hashlib.sha1(smiles.encode("utf-8")).hexdigest()
+
+
+class DescriptorStore:
+    """Descriptor values keyed by SMILES hash and descriptor key.
+
+    The descriptor keys are opaque here; compute_descriptors uses the
+    descriptor name, the function computing it and the RDKit version.
+
+    Molecules that failed are stored with a NULL value and the error, so
+    they are not recomputed either. Like PersistentCache, storage errors are
+    treated as misses.
+    """
+
+    def __init__(self, path: str = DESCRIPTOR_STORE_PATH):
+        self.path = path
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=SQLITE_TIMEOUT)
+        if not self._initialized:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("""CREATE TABLE IF NOT EXISTS descriptors (
+                                      smiles_hash TEXT NOT NULL,
+                                      descriptor TEXT NOT NULL,
+                                      value REAL,
+                                      error TEXT,
+                                      PRIMARY KEY (smiles_hash, descriptor))
+                                  WITHOUT ROWID""")
+            self._initialized = True
+        return connection
+
+    def get(self, smiles: List[str], descriptor_names: List[str]) -> tuple:
+        # returns values (len(smiles), len(descriptor_names)), errors and a
+        # mask of the molecules for which all descriptors were found
+        values = np.full((len(smiles), len(descriptor_names)), np.nan)
+        errors = [None] * len(smiles)
+        found = np.zeros((len(smiles), len(descriptor_names)), dtype=bool)
+        if not smiles:
+            return values, errors, found.all(axis=1)
+
+        row_of = {smiles_hash(smile): row for row, smile in enumerate(smiles)}
+        column_of = {name: column
+                     for column, name in enumerate(descriptor_names)}
+        try:
+            connection = self._connect()
+            try:
+                connection.execute("""CREATE TEMP TABLE requested (
+                                          smiles_hash TEXT PRIMARY KEY)""")
+                connection.executemany("INSERT INTO requested VALUES (?)",
+                                       [(key,) for key in row_of])
+                rows = connection.execute(
+                    """SELECT d.smiles_hash, d.descriptor, d.value, d.error
+                       FROM descriptors d
+                       JOIN requested r ON r.smiles_hash = d.smiles_hash
+                       WHERE d.descriptor IN ({})""".format(
+                        ", ".join("?" * len(descriptor_names))),
+                    descriptor_names).fetchall()
+            finally:
+                connection.close()
+        except sqlite3.Error:
+            return values, errors, found.all(axis=1)
+
+        for key, descriptor_name, value, error in rows:
+            row, column = row_of[key], column_of[descriptor_name]
+            found[row, column] = True
+            if value is not None:
+                values[row, column] = value
+            if error is not None:
+                errors[row] = error
+        return values, errors, found.all(axis=1)
+
+    def put(self, smiles: List[str], descriptor_names: List[str],
+            values: np.ndarray, errors: List[str]):
+        rows = [
+            (smiles_hash(smile), descriptor_name,
+             None if np.isnan(values[row, column])
+             else float(values[row, column]),
+             errors[row])
+            for row, smile in enumerate(smiles)
+            for column, descriptor_name in enumerate(descriptor_names)]
+        try:
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO descriptors VALUES (?, ?, ?, ?)",
+                        rows)
+            finally:
+                connection.close()
+        except sqlite3.Error:
+            pass
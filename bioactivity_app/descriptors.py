@@ -0,0 +1,167 @@
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from descriptor_store import DescriptorStore
+
+# functions of rdkit.Chem modules, which are imported on first use
+DESCRIPTOR_FUNCTIONS = {
+    "MW": ("Descriptors", "MolWt"),
+    "LogP": ("Descriptors", "MolLogP"),
+    "NumHDonors": ("Lipinski", "NumHDonors"),
+    "NumHAcceptors": ("Lipinski", "NumHAcceptors")
+}
+DEFAULT_DESCRIPTORS = list(DESCRIPTOR_FUNCTIONS.keys())
+
+DESCRIPTOR_ERROR_COLUMN = "descriptor_error"
+CHUNK_SIZE = 2_000
+WORKERS = int(os.environ.get("BIOACTIVITY_DESCRIPTOR_WORKERS",
+                             os.cpu_count() or 1))
+
+
+@functools.lru_cache(maxsize=None)
+def _rdkit() -> tuple:
+    # RDKit takes a noticeable part of the app start up, so it is only
+    # imported once descriptors are computed, in every worker process
+    from rdkit import Chem, RDLogger
+    from rdkit.Chem import Descriptors, Lipinski
+
+    # invalid SMILES are reported in DESCRIPTOR_ERROR_COLUMN instead
+    RDLogger.DisableLog("rdApp.*")
+    modules = {"Descriptors": Descriptors, "Lipinski": Lipinski}
+    functions = {name: getattr(modules[module], function)
+                 for name, (module, function) in DESCRIPTOR_FUNCTIONS.items()}
+    return Chem, functions
+
+
+@functools.lru_cache(maxsize=None)
+def store_key(descriptor_name: str) -> str:
+    # stored values are only reused for the same function of the same RDKit
+    # release; the rdkit package itself imports quickly
+    import rdkit
+
+    module, function = DESCRIPTOR_FUNCTIONS[descriptor_name]
+    return "{} rdkit.Chem.{}.{} {}".format(descriptor_name, module, function,
+                                            rdkit.__version__)
+
+
+def compute_descriptors_chunk(smiles: List[str], descriptor_names: List[str]
+                              ) -> tuple:
+    Chem, descriptor_functions = _rdkit()
+    values = np.full((len(smiles), len(descriptor_names)), np.nan)
+    errors = [None] * len(smiles)
+
+    for row, smile in enumerate(smiles):
+        if not isinstance(smile, str):
+            errors[row] = "missing SMILES"
+            continue
+
+        molecule = Chem.MolFromSmiles(smile)
+        if molecule is None:
+            errors[row] = "invalid SMILES"
+            continue
+
+        for column, descriptor_name in enumerate(descriptor_names):
+            try:
+                values[row, column] = descriptor_functions[descriptor_name](
+                    molecule)
+            except Exception as error:
+                values[row] = np.nan
+                errors[row] = "{}: {}".format(descriptor_name, error)
+                break
+
+    return values, errors
+
+
+# shared by all threads of the app and kept for its lifetime, one per
+# worker count
+_PROCESS_POOLS = {}
+_PROCESS_POOLS_LOCK = threading.Lock()
+
+
+def _process_pool(workers: int) -> ProcessPoolExecutor:
+    with _PROCESS_POOLS_LOCK:
+        if workers not in _PROCESS_POOLS:
+            # workers come from a fork server instead of forking the
+            # multithreaded app
+            _PROCESS_POOLS[workers] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("forkserver"))
+        return _PROCESS_POOLS[workers]
+
+
+def _compute_chunked(smiles: List[str], descriptor_names: List[str],
+                     workers: int, chunk_size: int) -> tuple:
+    chunks = [smiles[start:start + chunk_size]
+              for start in range(0, len(smiles), chunk_size)]
+
+    if workers > 1 and len(chunks) > 1:
+        results = list(_process_pool(workers).map(
+            compute_descriptors_chunk, chunks,
+            [descriptor_names] * len(chunks)))
+    else:
+        results = [compute_descriptors_chunk(chunk, descriptor_names)
+                   for chunk in chunks]
+
+    values = np.vstack([chunk_values for chunk_values, _ in results]
+                       or [np.empty((0, len(descriptor_names)))])
+    errors = [error for _, chunk_errors in results for error in chunk_errors]
+    return values, errors
+
+
+def compute_descriptors(smiles: pd.Series,
+                        descriptor_names: Optional[List[str]] = None,
+                        workers: int = WORKERS,
+                        chunk_size: int = CHUNK_SIZE,
+                        store: Optional[DescriptorStore] = None
+                        ) -> pd.DataFrame:
+    """Descriptor columns for every SMILES, aligned with the input index.
+
+    Each distinct SMILES is described once: molecules already in `store`
+    (under the store_key of every descriptor) are read from it, the rest are
+    split into chunks which are processed in a process pool when there is
+    more than one chunk and more than one worker, and then added to the
+    store. Molecules that cannot be parsed or described get NaN descriptors
+    and the reason in DESCRIPTOR_ERROR_COLUMN; the other rows are not
+    affected.
+    """
+    if not descriptor_names:
+        descriptor_names = DEFAULT_DESCRIPTORS
+
+    codes, unique_smiles = pd.factorize(smiles)
+    unique_smiles = unique_smiles.tolist()
+
+    store_keys = [store_key(name) for name in descriptor_names]
+    if store is not None:
+        values, errors, found = store.get(unique_smiles, store_keys)
+    else:
+        values = np.full((len(unique_smiles), len(descriptor_names)), np.nan)
+        errors = [None] * len(unique_smiles)
+        found = np.zeros(len(unique_smiles), dtype=bool)
+
+    missing = np.flatnonzero(~found)
+    if missing.size:
+        missing_smiles = [unique_smiles[row] for row in missing]
+        missing_values, missing_errors = _compute_chunked(
+            missing_smiles, descriptor_names, workers, chunk_size)
+        values[missing] = missing_values
+        for row, error in zip(missing, missing_errors):
+            errors[row] = error
+        if store is not None:
+            store.put(missing_smiles, store_keys, missing_values,
+                      missing_errors)
+
+    # code -1 marks a missing SMILES and picks the extra last row
+    values = np.vstack([values, np.full(len(descriptor_names), np.nan)])
+    errors = np.array(errors + ["missing SMILES"], dtype=object)
+
+    descriptors = pd.DataFrame(values[codes], columns=descriptor_names,
+                               index=smiles.index)
+    descriptors[DESCRIPTOR_ERROR_COLUMN] = errors[codes]
+    return descriptors
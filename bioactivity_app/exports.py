@@ -0,0 +1,81 @@
+import io
+import tempfile
+from typing import BinaryIO
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet
+
+# format name: file extension and MIME type
+EXPORT_FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+    "Arrow IPC": (".arrow", "application/vnd.apache.arrow.file"),
+}
+EXPORT_COMPRESSION = "zstd"
+EXPORT_CHUNK_ROWS = 50_000
+
+
+def _chunks(df: pd.DataFrame, chunk_rows: int):
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _write_csv(df: pd.DataFrame, sink, chunk_rows: int):
+    for number, chunk in enumerate(_chunks(df, chunk_rows)):
+        sink.write(chunk.to_csv(index=False, header=number == 0).encode(
+            "utf-8"))
+
+
+def _record_batches(df: pd.DataFrame, chunk_rows: int) -> tuple:
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    return schema, (pa.RecordBatch.from_pandas(chunk, schema=schema,
+                                               preserve_index=False)
+                    for chunk in _chunks(df, chunk_rows))
+
+
+def _write_parquet(df: pd.DataFrame, sink, chunk_rows: int):
+    schema, batches = _record_batches(df, chunk_rows)
+    with pyarrow.parquet.ParquetWriter(
+            sink, schema, compression=EXPORT_COMPRESSION) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+
+def _write_arrow_ipc(df: pd.DataFrame, sink, chunk_rows: int):
+    schema, batches = _record_batches(df, chunk_rows)
+    options = pyarrow.ipc.IpcWriteOptions(compression=EXPORT_COMPRESSION)
+    with pyarrow.ipc.new_file(sink, schema, options=options) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+
+WRITERS = {
+    "CSV": _write_csv,
+    "Parquet": _write_parquet,
+    "Arrow IPC": _write_arrow_ipc,
+}
+
+
+def export_df(df: pd.DataFrame, export_format: str,
+              chunk_rows: int = EXPORT_CHUNK_ROWS) -> BinaryIO:
+    """`df` written to a temporary file in one of EXPORT_FORMATS.
+
+    Rows are converted EXPORT_CHUNK_ROWS at a time and written to the file
+    as they are converted, so only one chunk is held in memory in its
+    converted form. The file is returned at its start and is deleted when
+    it is closed.
+    """
+    # a raw file, the file objects streamlit can read back do not include
+    # buffered ones opened for writing
+    sink = tempfile.TemporaryFile(buffering=0)
+    try:
+        writer = io.BufferedWriter(sink)
+        WRITERS[export_format](df, writer, chunk_rows)
+        writer.detach()
+    except BaseException:
+        sink.close()
+        raise
+    sink.seek(0)
+    return sink
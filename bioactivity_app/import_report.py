@@ -0,0 +1,74 @@
+# python import_report.py -output import_report.json
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# app modules in the order main.py reaches them
+APP_MODULES = [
+    "data_processing", "target_index", "jobs", "descriptors", "mann_whitney",
+    "exports", "visualizations"]
+# libraries that should only be loaded by the stage that needs them
+HEAVY_MODULES = [
+    "rdkit", "scipy", "scipy.stats", "chembl_webresource_client",
+    "plotly.express", "seaborn", "st_aggrid", "PIL"]
+# already loaded by streamlit run before main.py starts
+BASELINE_IMPORTS = "import streamlit, numpy, pandas"
+
+
+def measure(module: str) -> dict:
+    # cold import in a fresh interpreter after BASELINE_IMPORTS, with the
+    # heavy libraries it pulled in
+    code = "{}; import json, sys; before = set(sys.modules); import {}; " \
+           "print(json.dumps(sorted(set(sys.modules) - before)))".format(
+               BASELINE_IMPORTS, module)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=APP_DIR, capture_output=True, text=True,
+                            check=True)
+    loaded = set(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    # -X importtime lines: "import time: self [us] | cumulative | name";
+    # the module itself is the last top-level entry
+    cumulative = 0
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            cumulative = int(fields[1])
+    return {"module": module,
+            "import_seconds": cumulative / 1e6,
+            "heavy_modules": [name for name in HEAVY_MODULES
+                              if name in loaded]}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report cold import times of the bioactivity app modules")
+    parser.add_argument("-output", type=str, default=None,
+                        help="JSON file for the results (default: stdout)")
+    parser.add_argument("-modules", type=str, nargs="*",
+                        default=APP_MODULES + HEAVY_MODULES)
+    args = parser.parse_args()
+
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "baseline": BASELINE_IMPORTS,
+        "modules": [measure(module) for module in args.modules],
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "wt") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+# a stage gets the results published so far and returns its own
+Stage = Tuple[str, Callable[[dict], object]]
+
+
+class StopJob(Exception):
+    """Raised by a stage to end its job early without an error."""
+
+
+class Job:
+    """Stages of a pipeline running in a background thread.
+
+    Every stage gets the results of the stages before it. Results of the
+    stages in `kept` (all stages by default) are published in `results`
+    under the stage name as soon as they are ready, so readers can show
+    partial results while later stages run; the others are dropped when
+    the job finishes. Finished stages are listed in `completed`. A failing
+    stage stops the job and is kept in `error`; a stage raising StopJob
+    stops it with the reason in `stopped`.
+    """
+
+    def __init__(self, key: str, stage_names: List[str],
+                 kept: Optional[List[str]] = None):
+        self.key = key
+        self.stage_names = stage_names
+        self.kept = set(stage_names if kept is None else kept)
+        self.results = {}
+        self.completed = []
+        self.current_stage = None
+        self.error = None
+        self.stopped = None
+        self.done = False
+        self.finished_at = None
+
+    @property
+    def progress(self) -> float:
+        return len(self.completed) / len(self.stage_names)
+
+    def run(self, stages: List[Stage]):
+        results = {}
+        try:
+            for name, stage in stages:
+                self.current_stage = name
+                results[name] = stage(results)
+                # readers only ever see completed entries
+                if name in self.kept:
+                    self.results = {**self.results, name: results[name]}
+                self.completed = self.completed + [name]
+        except StopJob as stop:
+            self.stopped = str(stop)
+        except Exception as error:
+            self.error = error
+        finally:
+            self.current_stage = None
+            self.finished_at = time.time()
+            self.done = True
+
+
+class JobRunner:
+    """Runs jobs in a thread pool, one job per key.
+
+    Submitting a key that is running, or finished less than `max_age`
+    seconds ago, returns the existing job instead of starting a new one.
+    That includes failed jobs, so a failing stage is not run again on every
+    rerun; submitting with `retry` replaces a failed job. A job can be
+    shared under a second key with `alias`. Up to `max_finished` finished
+    jobs are kept.
+    """
+
+    def __init__(self, workers: int, max_finished: int, max_age: float):
+        self._executor = ThreadPoolExecutor(max_workers=workers,
+                                            thread_name_prefix="pipeline")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_finished = max_finished
+        self.max_age = max_age
+
+    def _reusable(self, job: Optional[Job]) -> bool:
+        if job is None:
+            return False
+        if not job.done:
+            return True
+        return time.time() - job.finished_at < self.max_age
+
+    def submit(self, key: str, stages: List[Stage],
+               kept: Optional[List[str]] = None, retry: bool = False) -> Job:
+        with self._lock:
+            job = self._jobs.get(key)
+            if self._reusable(job) and not (retry and job.error is not None):
+                self._jobs.move_to_end(key)
+                return job
+
+            job = Job(key, [name for name, _ in stages], kept)
+            self._jobs[key] = job
+            self._executor.submit(job.run, stages)
+
+            self._evict_finished()
+            return job
+
+    def alias(self, key: str, other_key: str):
+        # submitting `other_key` then returns the job of `key`
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not self._reusable(
+                    self._jobs.get(other_key)):
+                self._jobs[other_key] = job
+
+    def _evict_finished(self):
+        # called with the lock held
+        finished = [other_key for other_key, other in self._jobs.items()
+                    if other.done]
+        for other_key in finished[:max(0, len(finished) -
+                                       self.max_finished)]:
+            del self._jobs[other_key]
@@ -3,49 +3,57 @@
 import argparse
 import json
 import os
-import time
-from PIL import Image
 
 import streamlit as st
-from st_aggrid import AgGrid
-from st_aggrid.grid_options_builder import GridOptionsBuilder
 
 import data_processing as data
-import visualizations as vis
 
-SLEEP_TIME = 1
+# seconds between reruns of the job section while a background job runs
+JOB_POLL_INTERVAL = 0.5
 APP_DIR = os.getcwd() + "/bioactivity_app/"
 IMAGES_PATH = APP_DIR
 IMAGES_FILE = "images.json"
 
-parser = argparse.ArgumentParser()
-parser.add_argument("-images_path", type=str,
-                    default=IMAGES_PATH)
-parser.add_argument("-images_file", type=str,
-                    default=IMAGES_FILE)
-args = parser.parse_args()
 
-if (args.images_path != IMAGES_PATH
-        or args.images_file != IMAGES_FILE):
-    st.write("args!")
-    IMAGES_PATH = args.images_path
-    IMAGES_FILE = args.images_file
-elif os.environ.get('IMAGES_PATH') or os.environ.get('IMAGES_FILE'):
-    st.write("env!")
-    IMAGES_PATH = os.environ.get('IMAGES_PATH', IMAGES_PATH)
-    IMAGES_FILE = os.environ.get('IMAGES_FILE', IMAGES_FILE)
+@st.cache_resource(show_spinner=False)
+def load_config() -> dict:
+    # argv, the environment and images.json are read once per process
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-images_path", type=str,
+                        default=IMAGES_PATH)
+    parser.add_argument("-images_file", type=str,
+                        default=IMAGES_FILE)
+    args = parser.parse_args()
 
-IMAGES_FILE_PATH = IMAGES_PATH + "/" + IMAGES_FILE
+    images_path, images_file, source = IMAGES_PATH, IMAGES_FILE, None
+    if (args.images_path != IMAGES_PATH
+            or args.images_file != IMAGES_FILE):
+        source = "args"
+        images_path = args.images_path
+        images_file = args.images_file
+    elif os.environ.get('IMAGES_PATH') or os.environ.get('IMAGES_FILE'):
+        source = "env"
+        images_path = os.environ.get('IMAGES_PATH', images_path)
+        images_file = os.environ.get('IMAGES_FILE', images_file)
 
-with open(IMAGES_FILE_PATH, "rt") as f:
-    json_data = json.load(f)
+    with open(images_path + "/" + images_file, "rt") as f:
+        json_data = json.load(f)
 
-BIOACTIVITY_CLASSES_IMG_PATH = (
-        args.images_path + "/" + json_data["bioactivity_classes_img"])
+    return {"source": source,
+            "bioactivity_classes_img_path": (
+                args.images_path + "/" + json_data["bioactivity_classes_img"])}
+
+
+CONFIG = load_config()
+if CONFIG["source"] is not None:
+    st.write(CONFIG["source"] + "!")
+
+BIOACTIVITY_CLASSES_IMG_PATH = CONFIG["bioactivity_classes_img_path"]
 
 DEFAULT_FLAGS = [
     "collected_target_data",
     "target_chembl_id",
+    "target_chembl_ids",
     "collected_bioactivity_data",
     "finished_initial_preprocessing",
     "added_bioactivity_class",
@@ -61,14 +69,24 @@ WELCOME_MESSAGE = '''This app lets you search for targets in the ChEMBL
 database and retrieve bioactivity data for compounds that have been tested on 
 a chosen target. Then it performs data analysis tasks like data 
 pre-processing, creating graphs, adding Lipinski descriptors, and running the 
-Mann-Whitney U test. \\
-*Please note that, as it's currently a demo version, 
+Mann-Whitney U test.'''
+DEMO_MESSAGE = '''*Please note that, as it's currently a demo version, 
 you can only query targets related to Alzheimer's disease and Diabetes.*'''
 
 MANN_WHITNEY_DESCRIPTORS = [
     "pIC50", "MW", "LogP", "NumHDonors", "NumHAcceptors"]
 DESCRIPTORS = ["MW", "LogP", "NumHDonors", "NumHAcceptors"]
 
+STAGE_MESSAGES = {
+    "bioactivity_data": "Getting bioactivity data...",
+    "preprocessed": "Preprocessing Bioactivity Data...",
+    "bioactivity_class": "Adding bioactivity class...",
+    "pIC50": "Converting IC50 to pIC50...",
+    "lipinski_descriptors": "Adding Lipinski Descriptors...",
+    "compacted": "Compacting dataset...",
+    "mannwhitney": "Running Mann-Whitney U test...",
+}
+
 
 def no_compounds_found_error_message(class_name: str) -> str:
     return """
@@ -81,12 +99,37 @@ def attr_enabled(obj, name: str):
     return hasattr(obj, name) and getattr(obj, name)
 
 
+def job_result(stage: str):
+    # None until the stage of the current job has finished
+    return st.session_state["job"].results.get(stage)
+
+
+def stage_done(stage: str) -> bool:
+    # also for stages whose results are not kept by the job
+    return stage in st.session_state["job"].completed
+
+
+def download_dataset(dataset, label: str, file_name: str, key: str):
+    # the file is only built when the button is clicked, without a rerun
+    col_format, col_button = st.columns(spec=[0.3, 0.7])
+    with col_format:
+        export_format = st.selectbox("Format", list(data.EXPORT_FORMATS),
+                                     key=key + "-format")
+    with col_button:
+        extension, mime = data.EXPORT_FORMATS[export_format]
+        st.download_button(
+            label, lambda: data.export_dataset(dataset, export_format),
+            file_name + extension, mime, key=key, on_click="ignore")
+
+
 def reset_flags():
     for flag in DEFAULT_FLAGS:
         st.session_state[flag] = False
 
 
 def create_GridOptionsBuilder():
+    from st_aggrid.grid_options_builder import GridOptionsBuilder
+
     builder = GridOptionsBuilder.from_dataframe(st.session_state["targets"])
     builder.configure_grid_options(alwaysShowHorizontalScroll=True)
     builder.configure_selection(selection_mode="multiple", use_checkbox=True)
@@ -105,13 +148,27 @@ def process_table_response(input_row):
         st.session_state[target_info_item] = input_row[name_in_df].iloc[0]
 
 
+def process_table_responses(input_rows):
+    input_rows_index = [int(input_row["_selectedRowNodeInfo"]["nodeId"])
+                        for input_row in input_rows]
+    st.session_state["target_chembl_ids"] = st.session_state["targets"].iloc[
+        input_rows_index]["target_chembl_id"].tolist()
+
+
 st.header(WELCOME_MESSAGE_HEADER)
 st.markdown(WELCOME_MESSAGE)
+if data.get_target_index() is None:
+    st.markdown(DEMO_MESSAGE)
 
 # Get information for chosen target
 target_input_form = st.form(key="target_input_form")
-selected_target = target_input_form.selectbox(
-    "Choose query for target search:", SUPPORTED_TARGETS)
+if data.get_target_index() is not None:
+    selected_target = target_input_form.text_input(
+        "Search for targets:", SUPPORTED_TARGETS[0])
+else:
+    # without a local index every query goes to the remote service
+    selected_target = target_input_form.selectbox(
+        "Choose query for target search:", SUPPORTED_TARGETS)
 
 target_submit_button = target_input_form.form_submit_button(label="Submit")
 
@@ -119,7 +176,8 @@ target_submit_button = target_input_form.form_submit_button(label="Submit")
 if target_submit_button:
     reset_flags()
     try:
-        if selected_target not in SUPPORTED_TARGETS:
+        if (data.get_target_index() is None
+                and selected_target not in SUPPORTED_TARGETS):
             st.write("Sorry, currently only the following targets are "
                      "supported: " + ", ".join(SUPPORTED_TARGETS))
         else:
@@ -136,7 +194,10 @@ if attr_enabled(st.session_state, "collected_target_data"):
     st.write("✔️ Loaded target data for query: ", selected_target)
 
     try:
-        st.write("Please choose one target from the table:")
+        st.write("Please choose one target from the table, or several "
+                 "to compare them:")
+        from st_aggrid import AgGrid
+
         go = create_GridOptionsBuilder()
         response = AgGrid(st.session_state["targets"], gridOptions=go,
                           use_checkbox=True, reload_data=False)
@@ -158,209 +219,281 @@ if attr_enabled(st.session_state, "collected_target_data"):
                     st.write("Sorry, we couldn't process the response from "
                              "the table")
             elif selected_row and len(selected_row) > 1:
-                st.write("Please select only one row")
+                try:
+                    process_table_responses(selected_row)
+                except Exception:
+                    st.write("Sorry, we couldn't process the response from "
+                             "the table")
             else:
                 st.write("Please select a row")
 
-# step 3: query Chembl for target data by target_chembl_id
-if attr_enabled(st.session_state, "target_chembl_id"):
+# several targets selected: run them all and compare
+if attr_enabled(st.session_state, "target_chembl_ids"):
+    import visualizations as vis
+
     try:
-        st.session_state["bioactivity_df"] = data.get_target_bioactivity_data(
-            st.session_state["target_chembl_id"])
+        st.divider()
+        st.header("Target Comparison", anchor=False)
+        st.divider()
+
+        summary, combined = data.analyze_targets(
+            st.session_state["target_chembl_ids"], DESCRIPTORS,
+            MANN_WHITNEY_DESCRIPTORS)
+        st.write("Mann-Whitney U test p-values compare active and inactive "
+                 "compounds of each target:")
+        st.dataframe(summary, hide_index=True)
+
+        comparison_descriptor = st.selectbox(
+            "Choose descriptor to compare", MANN_WHITNEY_DESCRIPTORS,
+            key="comparison_descriptor")
+        vis.boxplot_targets_px(combined, comparison_descriptor)
+    except Exception:
+        st.write("Sorry, couldn't compare the selected targets")
+
+
+def submit_target_job(retry: bool = False):
+    # identical submissions return the running or finished job
+    permutation_test = st.session_state.get("permutation_test", False)
+    st.session_state["job"] = data.run_target_pipeline(
+        st.session_state["target_chembl_id"], DESCRIPTORS,
+        MANN_WHITNEY_DESCRIPTORS,
+        permutations=data.PERMUTATIONS if permutation_test else 0,
+        retry=retry)
+    return st.session_state["job"]
+
+
+def retry_target_job():
+    submit_target_job(retry=True)
+
+
+def target_job_section(polling: bool):
+    # reruns on its own every JOB_POLL_INTERVAL while `polling`, and reruns
+    # the app once the job has finished or a new one was started. Jobs are
+    # only submitted by full runs and by the widget callbacks below.
+    if st.session_state["job"].done == polling:
+        st.rerun()
+
+    if not st.session_state["job"].done:
+        st.progress(st.session_state["job"].progress,
+                    text=STAGE_MESSAGES.get(
+                        st.session_state["job"].current_stage, ""))
+
+    if job_result("bioactivity_data") is not None:
+        st.session_state["bioactivity_data"] = job_result("bioactivity_data")
+        st.session_state["bioactivity_df"] = (
+            st.session_state["bioactivity_data"].df)
         if st.session_state["bioactivity_df"].shape[0] != 0:
             st.session_state["collected_bioactivity_data"] = True
         else:
             st.session_state["collected_bioactivity_data"] = False
             st.write("Sorry, we couldn't find bioactivity data for the chosen "
                      "target")
-    except Exception:
+    elif st.session_state["job"].error is not None:
         st.write("Sorry, we couldn't get data for ", str(
             st.session_state["target_chembl_id"]))
 
-# step 4.1: initial data preprocessing
-if attr_enabled(st.session_state, "collected_bioactivity_data"):
-    try:
-        st.divider()
-        st.header("Data Processing", anchor=False)
-        st.divider()
+    # step 4.1: initial data preprocessing
+    if attr_enabled(st.session_state, "collected_bioactivity_data"):
+        try:
+            st.divider()
+            st.header("Data Processing", anchor=False)
+            st.divider()
+            st.markdown("""
+                            ✔️ Loaded bioactivity data for target **{}**\\
+                               Type: {}\\
+                               Organism: {}\\
+                               ChEMBL id: {}
+                        """.format(st.session_state["target_name"],
+                                   st.session_state["target_type"].lower(),
+                                   st.session_state["target_organism"].lower(),
+                                   st.session_state["target_chembl_id"])
+                        )
+
+            st.write("    Dataset preview: ")
+            st.dataframe(st.session_state["bioactivity_df"].head(3))
+            st.write("    Dataset size: ",
+                     st.session_state["bioactivity_df"].shape)
+
+            target_name = st.session_state["target_name"].lower().replace(
+                " ", "_")
+            download_dataset(st.session_state["bioactivity_data"],
+                             "Download Original Dataset",
+                             "bioactivity_dataset_" + target_name,
+                             key="download")
+
+            if stage_done("preprocessed"):
+                st.session_state["finished_initial_preprocessing"] = True
+            elif st.session_state["job"].error is not None:
+                st.write("Sorry, couldn't finish initial preprocessing")
+        except Exception:
+            st.write("Sorry, couldn't finish initial preprocessing")
+
+    # step 4.2: add bioactivity class
+    if attr_enabled(st.session_state, "finished_initial_preprocessing"):
+        st.markdown("✔️ **Preprocessed dataset**")
+        st.markdown(""" 
+                - Removed NaNs
+                - Removed negative IC50 values
+                        """)
+
+        if stage_done("bioactivity_class"):
+            st.session_state["added_bioactivity_class"] = True
+        elif st.session_state["job"].error is not None:
+            st.write("Sorry, couldn't add bioactivity class")
+
+    # step 4.3: covert to pIC50
+    if attr_enabled(st.session_state, "added_bioactivity_class"):
+        st.markdown("✔️ **Added Bioactivity Class**")
+        st.write("All compounds have been categorized into three classes "
+                 "based on their standard values:")
+
+        st.image(BIOACTIVITY_CLASSES_IMG_PATH)
         st.markdown("""
-                        ✔️ Loaded bioactivity data for target **{}**\\
-                           Type: {}\\
-                           Organism: {}\\
-                           ChEMBL id: {}
-                    """.format(st.session_state["target_name"],
-                               st.session_state["target_type"].lower(),
-                               st.session_state["target_organism"].lower(),
-                               st.session_state["target_chembl_id"])
+        *Please be aware that we have excluded all records with 
+        intermediate bioactivity classifications from the dataset.*
+        """
                     )
+        if stage_done("pIC50"):
+            st.markdown("""
+                    ✔️ **Converted IC50 to pIC50**\\
+                       (the negative log of the IC50 value when converted to
+                       molar)
+                    """)
 
-        st.write("    Dataset preview: ")
-        st.dataframe(st.session_state["bioactivity_df"].head(3))
-        st.write("    Dataset size: ", st.session_state["bioactivity_df"].shape)
-
-        csv = data.convert_df(st.session_state["bioactivity_df"])
-        target_name = st.session_state["target_name"].lower().replace(" ", "_")
-        st.download_button("Download Original Dataset", csv,
-                           "bioactivity_dataset_" + target_name + ".csv",
-                           "text/csv", key="download-csv")
+            st.session_state["converted_to_pIC50"] = True
+        elif st.session_state["job"].error is not None:
+            st.write("Sorry, couldn't convert to pIC50")
+
+    # step 4.4: add Lipinski descriptors
+    if attr_enabled(st.session_state, "converted_to_pIC50"):
+        if job_result("compacted") is not None:
+            (st.session_state["dataset"],
+             st.session_state["compacted_bytes"]) = job_result("compacted")
+            st.session_state["df"] = st.session_state["dataset"].df
+            if st.session_state["df"].shape[0] != 0:
+                st.session_state["added_lipinski_descriptors"] = True
+            else:
+                st.write("Sorry, dataframe became empty after preprocessing")
+        elif st.session_state["job"].error is not None:
+            st.write("Sorry, couldn't add Lipinski Descriptors")
 
-        st.session_state["df"] = data.preprocess_bioactivity_df(
-            st.session_state["bioactivity_df"])
-        if st.session_state["df"].shape[0] != 0:
-            st.session_state["finished_initial_preprocessing"] = True
+    # step 5: Mann-Whitney U test
+    if attr_enabled(st.session_state, "added_lipinski_descriptors"):
+        st.markdown("✔️ **Added Lipinski Descriptors**")
+        st.markdown("""
+            * MV - Molecular mass
+            * logP - Partition coefficient
+            * NumHDonors - Hydrogen bond donors
+            * NumHAcceptors - Hydrogen bond acceptors
+            """)
+
+        st.write("Dataset preview:")
+        st.dataframe(st.session_state["df"].head(3), hide_index=True)
+        st.write("Dataset size: ", st.session_state["df"].shape)
+        st.write("Dataset memory: {:.1f} MB ({:.1f} MB saved by "
+                 "compaction)".format(
+                     st.session_state["df"].memory_usage(deep=True).sum()
+                     / 2 ** 20,
+                     st.session_state["compacted_bytes"] / 2 ** 20))
+
+        target_name = st.session_state["target_name"].lower().replace(
+            " ", "_")
+        download_dataset(st.session_state["dataset"],
+                         "Download Pre-processed Dataset",
+                         "bioactivity_preprocessed_dataset_" + target_name,
+                         key="download-preprocessed")
+
+        active = st.session_state["df"][
+            st.session_state["df"].bioactivity_class == "active"]
+        inactive = st.session_state["df"][
+            st.session_state["df"].bioactivity_class == "inactive"]
+
+        if active.shape[0] == 0:
+            st.markdown(no_compounds_found_error_message(class_name="active"))
+        elif inactive.shape[0] == 0:
+            st.markdown(no_compounds_found_error_message(
+                class_name="inactive"))
         else:
-            st.write("Sorry, dataframe became empty after preprocessing")
-    except Exception:
-        st.write("Sorry, couldn't finish initial preprocessing")
-
-# step 4.2: add bioactivity class
-if attr_enabled(st.session_state, "finished_initial_preprocessing"):
-    st.markdown("✔️ **Preprocessed dataset**")
-    st.markdown(""" 
-            - Removed NaNs
-            - Removed negative IC50 values
-                    """)
+            # read when the job is submitted, changing it starts a new job
+            st.checkbox("Estimate p-values with a permutation test ({:,} "
+                        "label permutations)".format(data.PERMUTATIONS),
+                        key="permutation_test", on_change=submit_target_job)
+            if job_result("mannwhitney") is not None:
+                st.session_state["mannwhitney_df"] = job_result("mannwhitney")
+                st.session_state["finished_data_processing"] = True
+                st.markdown("✔️ **Finished Mann-Whitney U test**")
+            elif st.session_state["job"].error is not None:
+                st.write("Sorry, couldn't run Mann-Whitney U test")
+
+    # step 6: visualizations
+    if attr_enabled(st.session_state, "finished_data_processing"):
+        # plotly is only imported once there is something to plot
+        import visualizations as vis
 
-    try:
-        st.session_state["df"] = data.add_bioactivity_class(
-            st.session_state["df"])
-        st.session_state["added_bioactivity_class"] = True
-    except Exception:
-        st.write("Sorry, couldn't add bioactivity class")
-
-# step 4.3: covert to pIC50
-if attr_enabled(st.session_state, "added_bioactivity_class"):
-    st.markdown("✔️ **Added Bioactivity Class**")
-    st.write("All compounds have been categorized into three classes based on "
-             "their standard values:")
-
-    image = Image.open(BIOACTIVITY_CLASSES_IMG_PATH)
-    st.image(image)
-    st.markdown("""
-    *Please be aware that we have excluded all records with 
-    intermediate bioactivity classifications from the dataset.*
-    """
-                )
-    try:
-        st.session_state["df"] = data.convert_to_pIC50(st.session_state["df"])
+        st.divider()
+        st.header("Data Analysis Result", anchor=False)
+        st.divider()
 
-        st.markdown("""
-                ✔️ **Converted IC50 to pIC50**\\
-                   (the negative log of the IC50 value when converted to molar)
-                """)
+        col_frequency, col_pIC50 = st.columns(spec=[0.5, 0.5])
+        with col_frequency:
+            vis.plot_bioactivity_class_frequency_px(st.session_state["df"])
+        with col_pIC50:
+            vis.plot_pIC50_px(st.session_state["df"])
+
+        default_x_axis = MANN_WHITNEY_DESCRIPTORS[1]
+        default_y_axis = MANN_WHITNEY_DESCRIPTORS[2]
+
+        with st.form(key="scatter_plot_input_form"):
+            col_x_axis, col4_y_axis = st.columns(spec=[0.5, 0.5])
+            with col_x_axis:
+                plot_x_axis = st.selectbox(
+                    "Choose argument for X axis",
+                    list(MANN_WHITNEY_DESCRIPTORS), index=1, key=123)
+            with col4_y_axis:
+                plot_y_axis = st.selectbox(
+                    "Choose argument Y axis", list(MANN_WHITNEY_DESCRIPTORS),
+                    index=2, key=124)
+
+            scatter_plot_submit_button = st.form_submit_button(label="Plot")
+
+        if scatter_plot_submit_button:
+            vis.scatterplot_px(st.session_state["df"], plot_x_axis,
+                               plot_y_axis, "bioactivity_class", "pIC50")
+        else:
+            vis.scatterplot_px(st.session_state["df"], default_x_axis,
+                               default_y_axis, "bioactivity_class", "pIC50")
 
-        st.session_state["df"] = st.session_state["df"].reset_index(drop=True)
-        st.session_state["converted_to_pIC50"] = True
-    except Exception:
-        st.write("Sorry, couldn't convert to pIC50")
+        st.markdown("""
+            *pIC50 is used as point size*
+            """)
 
-# step 4.4: add Lipinski descriptors
-if attr_enabled(st.session_state, "converted_to_pIC50"):
-    try:
-        st.session_state["df"] = data.add_lipinski_descriptors(
-            st.session_state["df"], DESCRIPTORS)
-        st.session_state["added_lipinski_descriptors"] = True
-    except Exception:
-        st.write("Sorry, couldn't add Lipinski Descriptors")
-
-# step 5: Mann-Whitney U test
-if attr_enabled(st.session_state, "added_lipinski_descriptors"):
-    st.markdown("✔️ **Added Lipinski Descriptors**")
-    st.markdown("""
-        * MV - Molecular mass
-        * logP - Partition coefficient
-        * NumHDonors - Hydrogen bond donors
-        * NumHAcceptors - Hydrogen bond acceptors
-        """)
-
-    st.write("Dataset preview:")
-    st.dataframe(st.session_state["df"].head(3), hide_index=True)
-    st.write("Dataset size: ", st.session_state["df"].shape)
-
-    csv_preprocessed = data.convert_df(st.session_state["df"])
-    target_name = st.session_state["target_name"].lower().replace(" ", "_")
-    st.download_button("Download Pre-processed Dataset", csv_preprocessed,
-                       "bioactivity_preprocessed_dataset_" + target_name +
-                       ".csv", "text/csv", key="download-preprocessed-csv")
-
-    active = st.session_state["df"][
-        st.session_state["df"].bioactivity_class == "active"]
-    inactive = st.session_state["df"][
-        st.session_state["df"].bioactivity_class == "inactive"]
-
-    if active.shape[0] == 0:
-        st.markdown(no_compounds_found_error_message(class_name="active"))
-    elif inactive.shape[0] == 0:
-        st.markdown(no_compounds_found_error_message(class_name="inactive"))
-    else:
-        try:
-            st.session_state["mannwhitney_dict"] = dict()
-            with st.spinner("Running Mann-Whitney U test..."):
-                time.sleep(SLEEP_TIME)
-                for descriptor in MANN_WHITNEY_DESCRIPTORS:
-                    descriptor_result = data.mannwhitney_u_test(
-                        st.session_state["df"], descriptor)
-                    st.session_state["mannwhitney_dict"].update(
-                        {descriptor: descriptor_result})
-            st.session_state["finished_data_processing"] = True
-            st.markdown("✔️ **Finished Mann-Whitney U test**")
-        except Exception:
-            st.write("Sorry, couldn't run Mann-Whitney U test")
-
-# step 6: visualizations
-if attr_enabled(st.session_state, "finished_data_processing"):
-    st.divider()
-    st.header("Data Analysis Result", anchor=False)
-    st.divider()
-
-    col_frequency, col_pIC50 = st.columns(spec=[0.5, 0.5])
-    with col_frequency:
-        vis.plot_bioactivity_class_frequency_px(st.session_state["df"])
-    with col_pIC50:
-        vis.plot_pIC50_px(st.session_state["df"])
-
-    default_x_axis = MANN_WHITNEY_DESCRIPTORS[1]
-    default_y_axis = MANN_WHITNEY_DESCRIPTORS[2]
-
-    with st.form(key="scatter_plot_input_form"):
-        col_x_axis, col4_y_axis = st.columns(spec=[0.5, 0.5])
-        with col_x_axis:
-            plot_x_axis = st.selectbox(
-                "Choose argument for X axis", list(MANN_WHITNEY_DESCRIPTORS),
-                index=1, key=123)
-        with col4_y_axis:
-            plot_y_axis = st.selectbox(
-                "Choose argument Y axis", list(MANN_WHITNEY_DESCRIPTORS),
-                index=2, key=124)
-
-        scatter_plot_submit_button = st.form_submit_button(label="Plot")
-
-    if scatter_plot_submit_button:
-        vis.scatterplot_px(st.session_state["df"], plot_x_axis, plot_y_axis,
-                           "bioactivity_class", "pIC50")
-    else:
-        vis.scatterplot_px(st.session_state["df"], default_x_axis,
-                           default_y_axis, "bioactivity_class", "pIC50")
+        st.divider()
 
-    st.markdown("""
-        *pIC50 is used as point size*
-        """)
+        if len(st.session_state["mannwhitney_df"]) != 0:
+            st.header("Mann-Whitney U Test Result", anchor=False)
+            st.divider()
 
-    st.divider()
+            for descriptor in MANN_WHITNEY_DESCRIPTORS:
+                st.markdown("""
+                    **Descriptor: {}**
+                    """.format(descriptor))
+                vis.boxplot_bioactivity_class_px(st.session_state["df"],
+                                                 descriptor)
+
+                mannwhitney_df = st.session_state["mannwhitney_df"]
+                st.dataframe(
+                    mannwhitney_df[mannwhitney_df.Descriptor == descriptor],
+                    hide_index=True)
+                st.divider()
+        else:
+            st.write("Sorry, no results to show")
 
-    if len(st.session_state["mannwhitney_dict"]) != 0:
-        st.header("Mann-Whitney U Test Result", anchor=False)
-        st.divider()
+    if st.session_state["job"].error is not None:
+        st.button("Retry", key="retry-job", on_click=retry_target_job)
 
-        for descriptor in MANN_WHITNEY_DESCRIPTORS:
-            st.markdown("""
-                **Descriptor: {}**
-                """.format(descriptor))
-            vis.boxplot_bioactivity_class_px(st.session_state["df"],
-                                             descriptor)
 
-            st.dataframe(st.session_state["mannwhitney_dict"][descriptor],
-                         hide_index=True)
-            st.divider()
-    else:
-        st.write("Sorry, no results to show")
+# step 3: process the chosen target in a background job
+if attr_enabled(st.session_state, "target_chembl_id"):
+    job_polling = not submit_target_job().done
+    st.fragment(run_every=JOB_POLL_INTERVAL if job_polling else None)(
+        target_job_section)(job_polling)
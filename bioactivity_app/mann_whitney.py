@@ -0,0 +1,116 @@
+from typing import Optional
+
+import numpy as np
+
+# below this many values in a class scipy may use the exact distribution
+EXACT_MAX_SIZE = 8
+# permuted label rows x molecules evaluated per matrix product
+PERMUTATION_BATCH_CELLS = 4_000_000
+
+
+def _rank_columns(values: np.ndarray) -> tuple:
+    # average ranks of every column in one sort; NaNs sort last and get NaN.
+    # Also returns sum(t^3 - t) over the tie groups of every column, written
+    # as the sum of t^2 - 1 over the tied values.
+    n = values.shape[0]
+    order = np.argsort(values, axis=0, kind="stable")
+    ordered = np.take_along_axis(values, order, axis=0)
+    valid = ~np.isnan(ordered)
+
+    position = np.arange(n)[:, None]
+    first = np.ones(ordered.shape, dtype=bool)
+    first[1:] = ordered[1:] != ordered[:-1]
+    last = np.ones(ordered.shape, dtype=bool)
+    last[:-1] = first[1:]
+    start = np.maximum.accumulate(np.where(first, position, 0), axis=0)
+    end = np.minimum.accumulate(
+        np.where(last, position, n - 1)[::-1], axis=0)[::-1]
+
+    ordered_ranks = np.where(valid, (start + end) / 2 + 1, np.nan)
+    ties = end - start + 1
+    tie_term = np.where(valid, ties ** 2 - 1, 0).sum(axis=0)
+
+    ranks = np.empty_like(ordered_ranks)
+    np.put_along_axis(ranks, order, ordered_ranks, axis=0)
+    return ranks, tie_term
+
+
+def _z_scores(U1, n1, n2, tie_term, continuity: bool):
+    n = n1 + n2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = np.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))))
+        numerator = np.abs(U1 - n1 * n2 / 2)
+        if continuity:
+            numerator = numerator - 0.5
+        return numerator / s
+
+
+def _permutation_p_values(ranks: np.ndarray, n_active: int, tie_term,
+                          observed, permutations: int,
+                          rng: np.random.Generator) -> np.ndarray:
+    valid = (~np.isnan(ranks)).astype(float)
+    filled_ranks = np.nan_to_num(ranks)
+    labels = np.zeros(ranks.shape[0])
+    labels[:n_active] = 1
+    batch = max(1, PERMUTATION_BATCH_CELLS // ranks.shape[0])
+
+    exceeding = np.zeros(ranks.shape[1])
+    for done in range(0, permutations, batch):
+        size = min(batch, permutations - done)
+        active = rng.permuted(np.tile(labels, (size, 1)), axis=1)
+        n1 = active @ valid
+        n2 = valid.sum(axis=0) - n1
+        U1 = active @ filled_ranks - n1 * (n1 + 1) / 2
+        z = _z_scores(U1, n1, n2, tie_term, continuity=False)
+        exceeding += (z >= observed - 1e-12).sum(axis=0)
+    return (exceeding + 1) / (permutations + 1)
+
+
+def mannwhitney_u(active: np.ndarray, inactive: np.ndarray,
+                  permutations: int = 0,
+                  rng: Optional[np.random.Generator] = None) -> tuple:
+    """Two-sided Mann-Whitney U test for every column of two samples.
+
+    `active` and `inactive` have one column per descriptor; NaNs are left
+    out of the test of their column. All columns are ranked together in a
+    single pass, and U is the statistic of `active` as in
+    scipy.stats.mannwhitneyu. P-values are asymptotic like scipy's for large
+    samples, small samples are passed to scipy to get its exact test.
+
+    With `permutations` the p-values are instead estimated by permuting the
+    class labels with `rng`, evaluating all permutations of a batch with one
+    matrix product.
+    """
+    active = np.asarray(active, dtype=float)
+    inactive = np.asarray(inactive, dtype=float)
+    ranks, tie_term = _rank_columns(np.vstack([active, inactive]))
+
+    n_active = active.shape[0]
+    n1 = (~np.isnan(active)).sum(axis=0)
+    n2 = (~np.isnan(inactive)).sum(axis=0)
+    U1 = np.nansum(ranks[:n_active], axis=0) - n1 * (n1 + 1) / 2
+    U1[(n1 == 0) | (n2 == 0)] = np.nan
+
+    if permutations:
+        if rng is None:
+            rng = np.random.default_rng()
+        observed = _z_scores(U1, n1, n2, tie_term, continuity=False)
+        p_values = _permutation_p_values(ranks, n_active, tie_term, observed,
+                                         permutations, rng)
+        p_values[np.isnan(U1)] = np.nan
+        return U1, p_values
+
+    # scipy.stats alone takes most of a second to import, so it is only
+    # loaded for the small samples
+    from scipy.special import ndtr
+
+    z = _z_scores(U1, n1, n2, tie_term, continuity=True)
+    p_values = np.clip(2 * ndtr(-z), 0, 1)
+
+    for column in np.flatnonzero((np.minimum(n1, n2) <= EXACT_MAX_SIZE)
+                                 & ~np.isnan(U1)):
+        from scipy.stats import mannwhitneyu
+        p_values[column] = mannwhitneyu(
+            active[:, column][~np.isnan(active[:, column])],
+            inactive[:, column][~np.isnan(inactive[:, column])]).pvalue
+    return U1, p_values
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import time
+from typing import Optional
+
+import pandas as pd
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CACHE_PATH = os.environ.get(
+    "BIOACTIVITY_CACHE_PATH", os.path.join(APP_DIR, ".cache", "chembl.sqlite"))
+CACHE_TTL = float(os.environ.get("BIOACTIVITY_CACHE_TTL", 7 * 24 * 60 * 60))
+CACHE_MAX_BYTES = int(os.environ.get("BIOACTIVITY_CACHE_MAX_BYTES", 2 << 30))
+
+SQLITE_TIMEOUT = 30
+
+
+def cache_key(*parts) -> str:
+    return hashlib.sha256(
+        json.dumps(parts, default=str).encode("utf-8")).hexdigest()
+
+
+class PersistentCache:
+    """DataFrame cache stored in SQLite, shared by all app processes.
+
+    Entries expire `ttl` seconds after they were created, however often
+    they were refreshed since, and the least recently used ones are evicted
+    once the stored size exceeds `max_bytes`. Each operation opens
+    its own connection, so the cache can be used from any thread or process;
+    SQLite's WAL mode and busy timeout serialize concurrent writers.
+    Storage errors and entries that cannot be unpickled are treated as
+    cache misses.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, ttl: float = CACHE_TTL,
+                 max_bytes: int = CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=SQLITE_TIMEOUT,
+                                     isolation_level=None)
+        if not self._initialized:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("""CREATE TABLE IF NOT EXISTS entries (
+                                      key TEXT PRIMARY KEY,
+                                      value BLOB NOT NULL,
+                                      size INTEGER NOT NULL,
+                                      created REAL NOT NULL,
+                                      accessed REAL NOT NULL,
+                                      refreshed REAL NOT NULL)""")
+            connection.execute("""CREATE INDEX IF NOT EXISTS entries_accessed
+                                  ON entries (accessed)""")
+            self._initialized = True
+        return connection
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        return self.get_with_age(key)[0]
+
+    def get_with_age(self, key: str) -> tuple:
+        # the frame and the seconds since it was stored or last refreshed,
+        # (None, None) on a miss
+        try:
+            connection = self._connect()
+            try:
+                row = connection.execute(
+                    "SELECT value, created, refreshed FROM entries "
+                    "WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None, None
+
+                value, created, refreshed = row
+                now = time.time()
+                if now - created > self.ttl:
+                    connection.execute("DELETE FROM entries WHERE key = ?",
+                                       (key,))
+                    return None, None
+
+                try:
+                    df = pickle.loads(value)
+                except Exception:
+                    # written by an incompatible pandas version, or damaged
+                    connection.execute("DELETE FROM entries WHERE key = ?",
+                                       (key,))
+                    return None, None
+
+                connection.execute(
+                    "UPDATE entries SET accessed = ? WHERE key = ?",
+                    (now, key))
+            finally:
+                connection.close()
+        except sqlite3.Error:
+            return None, None
+
+        return df, now - refreshed
+
+    def refreshed_at(self, key: str) -> Optional[float]:
+        # when an entry was stored or last refreshed, without loading it
+        try:
+            connection = self._connect()
+            try:
+                row = connection.execute(
+                    "SELECT created, refreshed FROM entries WHERE key = ?",
+                    (key,)).fetchone()
+            finally:
+                connection.close()
+        except sqlite3.Error:
+            return None
+
+        if row is None or time.time() - row[0] > self.ttl:
+            return None
+        return row[1]
+
+    def touch(self, key: str):
+        # restart the age of an entry that is still up to date; its expiry
+        # after `ttl` is not postponed
+        try:
+            connection = self._connect()
+            try:
+                connection.execute(
+                    "UPDATE entries SET refreshed = ? WHERE key = ?",
+                    (time.time(), key))
+            finally:
+                connection.close()
+        except sqlite3.Error:
+            pass
+
+    def put(self, key: str, df: pd.DataFrame, keep_created: bool = False):
+        # with `keep_created` an entry updated in place expires when the
+        # entry it replaces would have
+        value = pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(value) > self.max_bytes:
+            return
+
+        try:
+            connection = self._connect()
+            try:
+                now = time.time()
+                connection.execute("BEGIN IMMEDIATE")
+                created = None
+                if keep_created:
+                    created = connection.execute(
+                        "SELECT created FROM entries WHERE key = ?",
+                        (key,)).fetchone()
+                connection.execute(
+                    """INSERT OR REPLACE INTO entries
+                       (key, value, size, created, accessed, refreshed)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+                    (key, value, len(value),
+                     now if created is None else created[0], now, now))
+                self._evict(connection, now)
+                connection.execute("COMMIT")
+            finally:
+                connection.close()
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, connection: sqlite3.Connection, now: float):
+        connection.execute("DELETE FROM entries WHERE created < ?",
+                           (now - self.ttl,))
+        total_size = connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total_size <= self.max_bytes:
+            return
+
+        evicted = []
+        for key, size in connection.execute(
+                "SELECT key, size FROM entries ORDER BY accessed"):
+            if total_size <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total_size -= size
+        connection.executemany("DELETE FROM entries WHERE key = ?", evicted)
+
+    def clear(self):
+        connection = self._connect()
+        try:
+            connection.execute("DELETE FROM entries")
+        finally:
+            connection.close()
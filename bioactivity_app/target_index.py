@@ -0,0 +1,89 @@
+import math
+import re
+from collections import defaultdict
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+INDEXED_COLUMNS = ["pref_name", "synonyms", "organism", "target_type"]
+# a query term found in pref_name counts this many times
+NAME_WEIGHT = 2
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text) -> list:
+    if not isinstance(text, str):
+        return []
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class TargetIndex:
+    """In-process inverted index over the text columns of a target table.
+
+    Query terms match indexed words they are a prefix of. A target scores
+    the inverse document frequency of every term it matches, counted
+    NAME_WEIGHT times when the term is in its pref_name; targets matching
+    no term are left out. Results are sorted by score, then pref_name, and
+    cut after `limit` rows when one is given.
+    """
+
+    def __init__(self, targets: pd.DataFrame):
+        self.targets = targets.sort_values(
+            "pref_name", kind="stable").reset_index(drop=True)
+        # results are built from arrays, which is much faster than iloc
+        self.columns = {name: self.targets[name].to_numpy()
+                        for name in self.targets.columns}
+
+        postings, name_postings = defaultdict(set), defaultdict(set)
+        for row, values in enumerate(self.targets[INDEXED_COLUMNS].itertuples(
+                index=False, name=None)):
+            for column, value in zip(INDEXED_COLUMNS, values):
+                for token in tokenize(value):
+                    postings[token].add(row)
+                    if column == "pref_name":
+                        name_postings[token].add(row)
+
+        self.vocabulary = np.array(sorted(postings), dtype=str)
+        self.postings = [np.fromiter(postings[token], dtype=np.int64)
+                         for token in self.vocabulary]
+        self.name_postings = [
+            np.fromiter(name_postings.get(token, ()), dtype=np.int64)
+            for token in self.vocabulary]
+
+    def _matching_rows(self, term: str) -> tuple:
+        # rows of all words starting with term, and of those in pref_name
+        start, stop = np.searchsorted(self.vocabulary,
+                                      [term, term + "\uffff"])
+        if start == stop:
+            return None, None
+        return (np.unique(np.concatenate(self.postings[start:stop])),
+                np.unique(np.concatenate(self.name_postings[start:stop])))
+
+    def search(self, query: str, limit: Optional[int] = None
+               ) -> pd.DataFrame:
+        scores = np.zeros(len(self.targets))
+        for term in set(tokenize(query)):
+            rows, name_rows = self._matching_rows(term)
+            if rows is None:
+                continue
+            idf = math.log(1 + len(self.targets) / len(rows))
+            scores[rows] += idf
+            scores[name_rows] += (NAME_WEIGHT - 1) * idf
+
+        matches = np.flatnonzero(scores)
+        if limit is not None and len(matches) > limit:
+            best = matches[np.argpartition(-scores[matches],
+                                           limit - 1)[:limit]]
+            # of the targets tied with the last one kept, a full sort would
+            # keep the first rows
+            lowest = scores[best].min()
+            better = best[scores[best] > lowest]
+            tied = matches[scores[matches] == lowest]
+            matches = np.sort(np.concatenate(
+                [better, tied[:limit - len(better)]]))
+        order = matches[np.argsort(-scores[matches], kind="stable")]
+        results = {name: values[order]
+                   for name, values in self.columns.items()}
+        results["score"] = scores[order]
+        return pd.DataFrame(results)
@@ -1,20 +1,64 @@
+import numpy as np
 import pandas as pd
 import streamlit as st
 
 import plotly.express as px
-import seaborn as sns
-
-sns.set(style="ticks")
+import plotly.graph_objects as go
 
 DEFAULT_LABEL_CONVERSION = {
     "bioactivity_class": "Bioactivity Class",
     "value": "pIC50"
 }
 
+# above this many rows only aggregates and a sample of the points are plotted
+LARGE_DATA_ROWS = 20_000
+# above this many rows scatter plots become density heatmaps
+DENSITY_ROWS = 200_000
+MAX_POINTS = 5_000
+HISTOGRAM_BINS = 50
+DENSITY_BINS = 100
+SAMPLE_SEED = 1
+
+
+def _sample(df: pd.DataFrame, max_points: int = MAX_POINTS) -> pd.DataFrame:
+    if len(df) <= max_points:
+        return df
+    return df.sample(n=max_points, random_state=SAMPLE_SEED)
+
+
+def _box_stats(values: np.ndarray) -> dict:
+    # Tukey box: quartiles and whiskers at the last values within 1.5 IQR
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return {"q1": np.nan, "median": np.nan, "q3": np.nan,
+                "lowerfence": np.nan, "upperfence": np.nan}
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    return {"q1": q1, "median": median, "q3": q3,
+            "lowerfence": values[values >= q1 - 1.5 * iqr].min(),
+            "upperfence": values[values <= q3 + 1.5 * iqr].max()}
+
+
+def _grouped_box_stats(df: pd.DataFrame, group: str, y_axis: str
+                       ) -> pd.DataFrame:
+    return pd.DataFrame.from_dict(
+        {name: _box_stats(values[y_axis].to_numpy(dtype=float))
+         for name, values in df.groupby(group, observed=True)},
+        orient="index")
+
 
 def plot_bioactivity_class_frequency_px(df: pd.DataFrame) -> st.plotly_chart:
-    fig = px.histogram(df, x="bioactivity_class", color="bioactivity_class",
-                       labels=DEFAULT_LABEL_CONVERSION)
+    if len(df) > LARGE_DATA_ROWS:
+        counts = df["bioactivity_class"].value_counts(sort=False)
+        counts = counts[counts > 0]
+        fig = px.bar(x=counts.index.astype(str), y=counts.to_numpy(),
+                     color=counts.index.astype(str),
+                     labels={"x": "Bioactivity Class",
+                             "color": "Bioactivity Class"})
+    else:
+        fig = px.histogram(df, x="bioactivity_class",
+                           color="bioactivity_class",
+                           labels=DEFAULT_LABEL_CONVERSION)
     fig.update_layout(xaxis_title="<b>Bioactivity Class</b>",
                       yaxis_title="<b>Frequency</b>",
                       title="<b>Distribution of Bioactivity Classes</b>")
@@ -22,28 +66,105 @@ def plot_bioactivity_class_frequency_px(df: pd.DataFrame) -> st.plotly_chart:
 
 
 def plot_pIC50_px(df: pd.DataFrame) -> st.plotly_chart:
-    fig = px.histogram(df, x="pIC50", labels=DEFAULT_LABEL_CONVERSION)
+    if len(df) > LARGE_DATA_ROWS:
+        values = df["pIC50"].to_numpy(dtype=float)
+        counts, edges = np.histogram(values[np.isfinite(values)],
+                                     bins=HISTOGRAM_BINS)
+        fig = px.bar(x=(edges[:-1] + edges[1:]) / 2, y=counts)
+        fig.update_traces(width=np.diff(edges))
+        fig.update_layout(bargap=0)
+    else:
+        fig = px.histogram(df, x="pIC50", labels=DEFAULT_LABEL_CONVERSION)
     fig.update_layout(yaxis_title="<b>Number of Compounds</b>",
                       xaxis_title="<b>pIC50</b>",
                       title="<b>Distribution of Compounds by pIC50 Value</b>")
     st.plotly_chart(fig, use_container_width=True)
 
 
+def _aggregated_boxplot_bioactivity_class(df: pd.DataFrame, y_axis: str
+                                          ) -> go.Figure:
+    # boxes from server side statistics over a sample of the points, drawn
+    # at numeric positions so the points can be jittered around them
+    stats = _grouped_box_stats(df, "bioactivity_class", y_axis)
+    sample = _sample(df)
+    rng = np.random.default_rng(SAMPLE_SEED)
+    colors = px.colors.qualitative.Plotly
+
+    fig = go.Figure()
+    for position, (name, box) in enumerate(stats.iterrows()):
+        color = colors[position % len(colors)]
+        points = sample[sample["bioactivity_class"] == name][y_axis]
+        fig.add_trace(go.Scattergl(
+            x=position + rng.uniform(-0.35, -0.15, len(points)),
+            y=points, mode="markers", name=name, showlegend=False,
+            marker={"color": color, "size": 3, "opacity": 0.4}))
+        fig.add_trace(go.Box(x=[position], name=name, marker_color=color,
+                             **{key: [value] for key, value in box.items()}))
+    fig.update_xaxes(tickvals=list(range(len(stats))),
+                     ticktext=list(stats.index.astype(str)))
+    return fig
+
+
 def boxplot_bioactivity_class_px(df: pd.DataFrame, y_axis: str
                                  ) -> st.plotly_chart:
-    fig = px.box(df, x="bioactivity_class", y=y_axis, points="all",
-                 labels=DEFAULT_LABEL_CONVERSION)
+    if len(df) > LARGE_DATA_ROWS:
+        fig = _aggregated_boxplot_bioactivity_class(df, y_axis)
+    else:
+        fig = px.box(df, x="bioactivity_class", y=y_axis, points="all",
+                     labels=DEFAULT_LABEL_CONVERSION)
     fig.update_layout(yaxis_title="<b>" + y_axis + "</b>",
                       xaxis_title="<b>" + "Bioactivity Class" + "</b>")
     st.plotly_chart(fig)
 
 
+def _density_heatmap(df: pd.DataFrame, x_axis: str, y_axis: str
+                     ) -> go.Figure:
+    values = df[[x_axis, y_axis]].to_numpy(dtype=float)
+    values = values[np.isfinite(values).all(axis=1)]
+    counts, x_edges, y_edges = np.histogram2d(values[:, 0], values[:, 1],
+                                              bins=DENSITY_BINS)
+    counts[counts == 0] = np.nan
+    return go.Figure(go.Heatmap(
+        x=(x_edges[:-1] + x_edges[1:]) / 2,
+        y=(y_edges[:-1] + y_edges[1:]) / 2,
+        z=counts.T, colorscale="Viridis",
+        colorbar={"title": "Compounds"}))
+
+
 def scatterplot_px(df, x_axis: str, y_axis: str, hue: str, size: str
                    ) -> st.plotly_chart:
-    fig = px.scatter(df, x=x_axis, y=y_axis, color=hue, size=size,
-                     color_discrete_sequence=px.colors.qualitative.Antique,
-                     labels=DEFAULT_LABEL_CONVERSION)
+    if len(df) > DENSITY_ROWS:
+        fig = _density_heatmap(df, x_axis, y_axis)
+    else:
+        # sizes are not supported by WebGL markers, so they are dropped too
+        large = len(df) > LARGE_DATA_ROWS
+        fig = px.scatter(_sample(df) if large else df, x=x_axis, y=y_axis,
+                         color=hue, size=None if large else size,
+                         render_mode="webgl" if large else "auto",
+                         color_discrete_sequence=(
+                             px.colors.qualitative.Antique),
+                         labels=DEFAULT_LABEL_CONVERSION)
     fig.update_layout(yaxis_title="<b>" + y_axis + "</b>",
                       xaxis_title="<b>" + x_axis + "</b>",
                       title=str(x_axis) + " vs " + str(y_axis))
     st.plotly_chart(fig)
+
+
+def boxplot_targets_px(df: pd.DataFrame, y_axis: str) -> st.plotly_chart:
+    if len(df) > LARGE_DATA_ROWS:
+        fig = go.Figure()
+        for name, class_df in df.groupby("bioactivity_class", observed=True):
+            stats = _grouped_box_stats(class_df, "target_chembl_id", y_axis)
+            fig.add_trace(go.Box(x=list(stats.index), name=str(name),
+                                 **{key: stats[key].tolist()
+                                    for key in stats.columns}))
+        fig.update_layout(boxmode="group", legend_title_text=(
+            DEFAULT_LABEL_CONVERSION["bioactivity_class"]))
+    else:
+        fig = px.box(df, x="target_chembl_id", y=y_axis,
+                     color="bioactivity_class",
+                     labels=DEFAULT_LABEL_CONVERSION)
+    fig.update_layout(yaxis_title="<b>" + y_axis + "</b>",
+                      xaxis_title="<b>Target</b>",
+                      title="<b>" + y_axis + " by Target</b>")
+    st.plotly_chart(fig, use_container_width=True)
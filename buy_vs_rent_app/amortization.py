@@ -0,0 +1,116 @@
+import numpy as np
+
+
+def geometric_sum(growth, periods) -> np.ndarray:
+    # sum of (1 + growth) ** k for k in [0, periods)
+    growth, periods = np.broadcast_arrays(
+        np.asarray(growth, dtype=float), np.asarray(periods, dtype=float)
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total = ((1.0 + growth) ** periods - 1.0) / growth
+    return np.where(growth == 0.0, periods, total)
+
+
+def monthly_payment(loan_amount, monthly_rate, term_months) -> np.ndarray:
+    loan_amount, monthly_rate, term_months = np.broadcast_arrays(
+        np.asarray(loan_amount, dtype=float),
+        np.asarray(monthly_rate, dtype=float),
+        np.asarray(term_months, dtype=float),
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gamma = (1.0 + monthly_rate) ** (-term_months)
+        payment = monthly_rate * loan_amount / (1.0 - gamma)
+        no_interest_payment = loan_amount / term_months
+    payment = np.where(monthly_rate == 0.0, no_interest_payment, payment)
+    # a zero-length loan is settled at purchase
+    return np.where(term_months <= 0, loan_amount, payment)
+
+
+def remaining_balance(
+    loan_amount, monthly_rate, monthly_payment, term_months, month
+) -> np.ndarray:
+    month = np.minimum(month, term_months)
+    balance = loan_amount * (1.0 + monthly_rate) ** month - (
+        monthly_payment * geometric_sum(monthly_rate, month)
+    )
+    return np.where(month >= term_months, 0.0, balance)
+
+
+def principal_paid(
+    loan_amount, monthly_rate, monthly_payment, term_months, start, end
+) -> np.ndarray:
+    # principal paid during months [start, end)
+    return remaining_balance(
+        loan_amount, monthly_rate, monthly_payment, term_months, start
+    ) - remaining_balance(loan_amount, monthly_rate, monthly_payment, term_months, end)
+
+
+def interest_paid(
+    loan_amount, monthly_rate, monthly_payment, term_months, start, end
+) -> np.ndarray:
+    # interest paid during months [start, end); nothing is paid after payoff
+    paying_months = np.minimum(end, term_months) - np.minimum(start, term_months)
+    principal = principal_paid(
+        loan_amount, monthly_rate, monthly_payment, term_months, start, end
+    )
+    return monthly_payment * np.maximum(paying_months, 0) - principal
+
+
+class Amortization:
+    def __init__(self, loan_amount: float, interest_rate: float, loan_length: float):
+
+        self.loan_amount = loan_amount
+        self.monthly_interest_rate = interest_rate / 12
+        self.term_months = int(round(loan_length * 12))
+        if self.loan_amount <= 0:
+            self.term_months = 0
+        self.monthly_payment = float(
+            monthly_payment(
+                self.loan_amount, self.monthly_interest_rate, self.term_months
+            )
+        )
+
+    def _args(self) -> tuple:
+        return (
+            self.loan_amount,
+            self.monthly_interest_rate,
+            self.monthly_payment,
+            self.term_months,
+        )
+
+    def balance(self, month: int) -> float:
+        return float(remaining_balance(*self._args(), month))
+
+    def principal_paid(self, start: int, end: int) -> float:
+        return float(principal_paid(*self._args(), start, end))
+
+    def interest_paid(self, start: int, end: int) -> float:
+        return float(interest_paid(*self._args(), start, end))
+
+    def year_totals(self, year: int) -> [float, float]:
+        # principal and interest paid during the given year (starting from 1)
+        start, end = 12 * (year - 1), 12 * year
+        return self.principal_paid(start, end), self.interest_paid(start, end)
+
+    def yearly_totals(self, years: int) -> [np.ndarray, np.ndarray]:
+        # principal and interest paid during each of the first `years` years
+        start = 12 * np.arange(years)
+        end = start + 12
+        return (
+            principal_paid(*self._args(), start, end),
+            interest_paid(*self._args(), start, end),
+        )
+
+    def schedule(self) -> dict:
+        # materialized only on request: one row per month until payoff
+        month = np.arange(self.term_months)
+        balance_start = remaining_balance(*self._args(), month)
+        balance_end = remaining_balance(*self._args(), month + 1)
+        principal = balance_start - balance_end
+        return {
+            "Month": month + 1,
+            "Payment": np.full(self.term_months, self.monthly_payment),
+            "Principal": principal,
+            "Interest": self.monthly_payment - principal,
+            "Balance": balance_end,
+        }
@@ -0,0 +1,164 @@
+import numpy as np
+
+from amortization import (
+    geometric_sum,
+    interest_paid,
+    monthly_payment,
+    principal_paid,
+)
+
+
+def _as_arrays(*values) -> list:
+    return np.broadcast_arrays(*[np.asarray(value, dtype=float) for value in values])
+
+
+def _year_columns(years: np.ndarray) -> tuple:
+    max_years = int(years.max(initial=0))
+    year = np.arange(max_years, dtype=float)
+    mask = year < years[..., None]
+    return year, mask
+
+
+class BatchOptionBuy:
+    """Vectorized counterpart of OptionBuy.
+
+    Every constructor argument may be a scalar or an array; all of them are
+    broadcast against each other and every result has the broadcast shape.
+    """
+
+    def __init__(
+        self,
+        home_price,
+        downpayment,
+        interest_rate,
+        loan_length,
+        tax,
+        maintenance,
+        monthly_hoa,
+        home_growth,
+        years_of_owning,
+        sell_comission,
+    ):
+
+        (
+            self.home_price,
+            self.downpayment,
+            self.interest_rate,
+            self.loan_length,
+            self.tax,
+            self.maintenance,
+            self.monthly_hoa,
+            self.home_growth,
+            years_of_owning,
+            self.sell_comission,
+        ) = _as_arrays(
+            home_price,
+            downpayment,
+            interest_rate,
+            loan_length,
+            tax,
+            maintenance,
+            monthly_hoa,
+            home_growth,
+            years_of_owning,
+            sell_comission,
+        )
+        self.years_of_owning = years_of_owning.astype(int)
+        self.loan_amount = self.home_price - self.downpayment
+        self._update_mortgage()
+
+    def _update_mortgage(self):
+        self.monthly_interest_rate = self.interest_rate / 12
+        self.term_months = np.where(
+            self.loan_amount > 0, np.round(self.loan_length * 12), 0
+        )
+        self.monthly_payment = monthly_payment(
+            self.loan_amount, self.monthly_interest_rate, self.term_months
+        )
+
+    def _mortgage_args(self, expand: bool = False) -> tuple:
+        args = (
+            self.loan_amount,
+            self.monthly_interest_rate,
+            self.monthly_payment,
+            self.term_months,
+        )
+        if expand:
+            return tuple(arg[..., None] for arg in args)
+        return args
+
+    def _calculate_home_extras(self):
+        growth_sum = geometric_sum(self.home_growth, self.years_of_owning)
+
+        self.total_tax = self.home_price * self.tax * growth_sum
+        self.total_maintenance = self.home_price * self.maintenance * growth_sum
+        self.total_hoa = 12 * self.monthly_hoa * growth_sum
+
+        self.total_home_extra = self.total_tax + self.total_maintenance + self.total_hoa
+        return self.total_home_extra
+
+    def _calculate_mortgage(self):
+        self.total_interest = interest_paid(
+            *self._mortgage_args(), 0, 12 * self.years_of_owning
+        )
+
+    def _calculate_home_sell(self):
+        home_growth = (1.0 + self.home_growth) ** (self.years_of_owning)
+        self.sell_home_price = self.home_price * home_growth
+        self.home_delta = (
+            self.sell_home_price * (1 - self.sell_comission) - self.home_price
+        )
+
+    def calculate(self) -> np.ndarray:
+        self._calculate_home_extras()
+        self._calculate_mortgage()
+        self._calculate_home_sell()
+
+        profit = -self.total_home_extra - self.total_interest + self.home_delta
+        return profit
+
+    def yearly_breakdown(self) -> dict:
+        # arrays of shape (*scenarios, max(years_of_owning)), zero past each
+        # scenario's own horizon
+        year, mask = _year_columns(self.years_of_owning)
+        growth = (1.0 + self.home_growth[..., None]) ** year
+
+        mortgage_args = self._mortgage_args(expand=True)
+        start, end = 12 * year, 12 * (year + 1)
+
+        breakdown = {
+            "Tax": (self.home_price * self.tax)[..., None] * growth,
+            "Maintenance": (self.home_price * self.maintenance)[..., None] * growth,
+            "HOA": (12 * self.monthly_hoa)[..., None] * growth,
+            "Principal": principal_paid(*mortgage_args, start, end),
+            "Interest": interest_paid(*mortgage_args, start, end),
+        }
+        return {name: np.where(mask, values, 0.0) for name, values in breakdown.items()}
+
+
+class BatchOptionRent:
+    """Vectorized counterpart of OptionRent, see BatchOptionBuy."""
+
+    def __init__(self, monthly_rent, rent_growth, downpayment, roi_percent, years):
+
+        (
+            self.monthly_rent,
+            self.rent_growth,
+            self.downpayment,
+            self.roi_percent,
+            years,
+        ) = _as_arrays(monthly_rent, rent_growth, downpayment, roi_percent, years)
+        self.years = years.astype(int)
+
+    def calculate(self) -> [np.ndarray, np.ndarray]:
+        total_roi = (
+            self.downpayment * (1 + self.roi_percent) ** (self.years) - self.downpayment
+        )
+        total_rent = 12 * self.monthly_rent * geometric_sum(self.rent_growth, self.years)
+
+        return total_roi, total_rent
+
+    def yearly_breakdown(self) -> dict:
+        year, mask = _year_columns(self.years)
+        rent = 12 * self.monthly_rent[..., None] * (1.0 + self.rent_growth[..., None]) ** year
+        return {"Rent": np.where(mask, rent, 0.0)}
@@ -0,0 +1,140 @@
+# python benchmark.py -output benchmark.json
+
+import argparse
+import json
+import platform
+import subprocess
+import time
+import timeit
+import tracemalloc
+
+import numpy as np
+
+from batch import BatchOptionBuy, BatchOptionRent
+from processing import OptionBuy, OptionRent
+
+SCENARIO = {
+    "home_price": 850_000,
+    "downpayment": 170_000,
+    "interest_rate": 0.065,
+    "loan_length": 30,
+    "tax": 0.01,
+    "maintenance": 0.01,
+    "monthly_hoa": 0.0,
+    "home_growth": 0.03,
+    "years_of_owning": 10,
+    "sell_comission": 0.1,
+}
+RENT_SCENARIO = {
+    "monthly_rent": 3500.0,
+    "rent_growth": 0.03,
+    "downpayment": 170_000,
+    "roi_percent": 0.03,
+    "years": 10,
+}
+SEED = 1
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _best_time(statement, repeat: int, number: int) -> float:
+    return min(timeit.repeat(statement, repeat=repeat, number=number)) / number
+
+
+def _scalar_scenario(years: int):
+    OptionBuy(**{**SCENARIO, "years_of_owning": years}).calculate()
+    OptionRent(**{**RENT_SCENARIO, "years": years}).calculate()
+
+
+def _batch_scenarios(size: int):
+    rng = np.random.default_rng(SEED)
+    home_price = rng.uniform(200_000, 2_000_000, size)
+    years = rng.integers(1, 31, size)
+
+    def run():
+        BatchOptionBuy(
+            **{**SCENARIO, "home_price": home_price, "years_of_owning": years}
+        ).calculate()
+        BatchOptionRent(**{**RENT_SCENARIO, "years": years}).calculate()
+
+    return run
+
+
+def _peak_memory(statement) -> int:
+    tracemalloc.start()
+    try:
+        statement()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def single_scenario_latency(repeat: int) -> dict:
+    years = SCENARIO["years_of_owning"]
+    seconds = _best_time(lambda: _scalar_scenario(years), repeat, number=1000)
+    return {"seconds": seconds,
+            "peak_memory_bytes": _peak_memory(lambda: _scalar_scenario(years))}
+
+
+def years_scaling(repeat: int) -> list:
+    results = []
+    for years in (1, 5, 10, 20, 30):
+        seconds = _best_time(lambda: _scalar_scenario(years), repeat, number=200)
+        results.append({"years_of_owning": years, "seconds": seconds})
+    return results
+
+
+def batch_throughput(max_size: int, repeat: int) -> list:
+    results = []
+    size = 1
+    while size <= max_size:
+        run = _batch_scenarios(size)
+        number = max(1, 100_000 // size)
+        seconds = _best_time(run, repeat, number)
+        results.append({
+            "size": size,
+            "seconds": seconds,
+            "scenarios_per_second": size / seconds,
+            "peak_memory_bytes": _peak_memory(run),
+        })
+        size *= 10
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the buy vs rent calculation engine")
+    parser.add_argument("-output", type=str, default=None,
+                        help="JSON file for the results (default: stdout)")
+    parser.add_argument("-max_batch_size", type=int, default=10_000_000)
+    parser.add_argument("-repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {
+        "revision": _git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "single_scenario": single_scenario_latency(args.repeat),
+        "years_scaling": years_scaling(args.repeat),
+        "batch_throughput": batch_throughput(args.max_batch_size, args.repeat),
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "wt") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+
+class Breakdown:
+    """Per-year values of several types, stored in long format.
+
+    The Year, Type and value columns are preallocated arrays with one row per
+    (year, type) pair; Type is kept as category codes. to_frame() wraps the
+    buffers in a DataFrame without copying them.
+    """
+
+    def __init__(self, value_name: str, types: list, years: int):
+        self.value_name = value_name
+        self.types = list(types)
+
+        self.year = np.repeat(np.arange(1, years + 1), len(self.types))
+        self.type_codes = np.tile(np.arange(len(self.types), dtype=np.int8), years)
+        self.values = np.zeros(years * len(self.types))
+
+    def set(self, value_type: str, values: np.ndarray):
+        self.values[self.types.index(value_type) :: len(self.types)] = values
+
+    def get(self, value_type: str) -> np.ndarray:
+        return self.values[self.types.index(value_type) :: len(self.types)]
+
+    def to_frame(self) -> pd.DataFrame:
+        columns = {"Year": self.year, self.value_name: self.values}
+        if len(self.types) > 1:
+            columns["Type"] = pd.Categorical.from_codes(
+                self.type_codes, self.types, validate=False
+            )
+        return pd.DataFrame(columns, copy=False)
@@ -0,0 +1,104 @@
+from typing import Optional
+
+import numpy as np
+
+from batch import BatchOptionBuy, BatchOptionRent
+
+BUY_PARAMETERS = [
+    "home_price",
+    "downpayment",
+    "interest_rate",
+    "loan_length",
+    "tax",
+    "maintenance",
+    "monthly_hoa",
+    "home_growth",
+    "years_of_owning",
+    "sell_comission",
+]
+
+BREAK_EVEN_BOUNDS = {
+    "monthly_rent": (0.0, 100_000.0),
+    "home_growth": (-0.5, 1.0),
+    "roi_percent": (-0.5, 1.0),
+    "years_of_owning": (1, 30),
+}
+INTEGER_PARAMETERS = {"years_of_owning"}
+
+GRID_SIZE = 65
+REFINEMENTS = 4
+
+
+def scenario_delta(scenario: dict) -> np.ndarray:
+    # with_home - without_home, broadcast over any array-valued parameters
+    buy = BatchOptionBuy(**{name: scenario[name] for name in BUY_PARAMETERS})
+    rent = BatchOptionRent(
+        monthly_rent=scenario["monthly_rent"],
+        rent_growth=scenario["rent_growth"],
+        downpayment=scenario["downpayment"],
+        roi_percent=scenario["roi_percent"],
+        years=scenario["years_of_owning"],
+    )
+    total_roi, total_rent = rent.calculate()
+    return buy.calculate() - (total_roi - total_rent)
+
+
+def _crossings(deltas: np.ndarray) -> np.ndarray:
+    # indices i such that delta changes sign (or hits zero) on [i, i + 1]
+    signs = np.sign(deltas)
+    return np.flatnonzero(signs[:-1] * signs[1:] <= 0)
+
+
+def _nearest_crossing(values: np.ndarray, deltas: np.ndarray, current: float
+                      ) -> Optional[int]:
+    crossings = _crossings(deltas)
+    if crossings.size == 0:
+        return None
+    midpoints = (values[crossings] + values[crossings + 1]) / 2
+    return int(crossings[np.argmin(np.abs(midpoints - current))])
+
+
+def find_break_even(
+    scenario: dict,
+    parameter: str,
+    low: Optional[float] = None,
+    high: Optional[float] = None,
+) -> Optional[float]:
+    """Value of `parameter` at which buying and renting end up equal.
+
+    The bracket [low, high] is scanned on a grid in one vectorized pass and
+    the sign change nearest to the current value is refined by repeated
+    grid subdivision. Returns None if delta does not change sign in the
+    bracket. For integer parameters the first value on the other side of
+    the break-even point is returned.
+    """
+    default_low, default_high = BREAK_EVEN_BOUNDS[parameter]
+    low = default_low if low is None else low
+    high = default_high if high is None else high
+    current = scenario[parameter]
+
+    def delta_at(values: np.ndarray) -> np.ndarray:
+        return scenario_delta({**scenario, parameter: values})
+
+    if parameter in INTEGER_PARAMETERS:
+        values = np.arange(int(low), int(high) + 1)
+        crossing = _nearest_crossing(values, delta_at(values), current)
+        if crossing is None:
+            return None
+        return int(values[crossing + 1])
+
+    values = np.linspace(low, high, GRID_SIZE)
+    crossing = _nearest_crossing(values, delta_at(values), current)
+    if crossing is None:
+        return None
+    low, high = values[crossing], values[crossing + 1]
+
+    for _ in range(REFINEMENTS):
+        values = np.linspace(low, high, GRID_SIZE)
+        crossing = _crossings(delta_at(values))[0]
+        low, high = values[crossing], values[crossing + 1]
+
+    delta_low, delta_high = delta_at(np.array([low, high]))
+    if delta_low == delta_high:
+        return float(low)
+    return float(low - delta_low * (high - low) / (delta_high - delta_low))
@@ -0,0 +1,147 @@
+# python cli.py scenarios.csv results.parquet -workers 4
+
+import argparse
+import collections
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from batch import BatchOptionBuy, BatchOptionRent
+from breakeven import BUY_PARAMETERS
+from monthly import SCENARIO_PARAMETERS, monthly_wealth
+
+DEFAULT_CHUNK_SIZE = 100_000
+PENDING_CHUNKS_PER_WORKER = 2
+# scenarios x months evaluated at once by the monthly model, which keeps
+# several float64 arrays of that shape alive
+MONTHLY_BLOCK_CELLS = 1_000_000
+
+
+def monthly_delta(columns: dict) -> np.ndarray:
+    # in blocks of rows sized by the longest horizon, so memory does not
+    # grow with the chunk size
+    rows = len(columns["years_of_owning"])
+    months = 12 * int(columns["years_of_owning"].max(initial=0))
+    block = max(1, MONTHLY_BLOCK_CELLS // max(1, months))
+    deltas = [
+        monthly_wealth({name: values[start : start + block] for name, values in columns.items()})[
+            "delta"
+        ]
+        for start in range(0, rows, block)
+    ]
+    return np.concatenate(deltas) if deltas else np.empty(0)
+
+
+def evaluate_scenarios(scenarios: pd.DataFrame, monthly: bool = False) -> pd.DataFrame:
+    missing = [name for name in SCENARIO_PARAMETERS if name not in scenarios]
+    if missing:
+        raise ValueError("Missing scenario columns: " + ", ".join(missing))
+
+    columns = {name: scenarios[name].to_numpy(dtype=float) for name in SCENARIO_PARAMETERS}
+    buy = BatchOptionBuy(**{name: columns[name] for name in BUY_PARAMETERS})
+    rent = BatchOptionRent(
+        monthly_rent=columns["monthly_rent"],
+        rent_growth=columns["rent_growth"],
+        downpayment=columns["downpayment"],
+        roi_percent=columns["roi_percent"],
+        years=columns["years_of_owning"],
+    )
+
+    with_home = buy.calculate()
+    total_roi, total_rent = rent.calculate()
+    without_home = total_roi - total_rent
+
+    result = scenarios.copy()
+    result["monthly_payment"] = buy.monthly_payment
+    result["total_interest"] = buy.total_interest
+    result["total_home_extra"] = buy.total_home_extra
+    result["home_delta"] = buy.home_delta
+    result["with_home"] = with_home
+    result["total_roi"] = total_roi
+    result["total_rent"] = total_rent
+    result["without_home"] = without_home
+    result["delta"] = with_home - without_home
+    if monthly:
+        result["monthly_delta"] = monthly_delta(columns)
+    return result
+
+
+def read_chunks(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+class ChunkWriter:
+    def __init__(self, path: str):
+        self.path = path
+        self.parquet_writer = None
+        self.written_header = False
+
+    def write(self, chunk: pd.DataFrame):
+        if self.path.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self.parquet_writer is None:
+                self.parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self.parquet_writer.write_table(table)
+        else:
+            chunk.to_csv(self.path, mode="a" if self.written_header else "w",
+                         header=not self.written_header, index=False)
+            self.written_header = True
+
+    def close(self):
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+
+
+def run(input_path: str, output_path: str, chunk_size: int, workers: int,
+        monthly: bool = False) -> int:
+    # chunks are evaluated in parallel but written in input order; at most
+    # PENDING_CHUNKS_PER_WORKER chunks per worker are held in memory
+    writer = ChunkWriter(output_path)
+    pending = collections.deque()
+    rows = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk in read_chunks(input_path, chunk_size):
+                pending.append(executor.submit(evaluate_scenarios, chunk, monthly))
+                if len(pending) >= workers * PENDING_CHUNKS_PER_WORKER:
+                    result = pending.popleft().result()
+                    writer.write(result)
+                    rows += len(result)
+            while pending:
+                result = pending.popleft().result()
+                writer.write(result)
+                rows += len(result)
+    finally:
+        writer.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Score buy vs rent scenarios from a CSV or Parquet file")
+    parser.add_argument("input", type=str)
+    parser.add_argument("output", type=str)
+    parser.add_argument("-chunk_size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("-workers", type=int, default=os.cpu_count())
+    parser.add_argument("-monthly", action="store_true",
+                        help="also compute the monthly model with reinvestment")
+    args = parser.parse_args()
+
+    rows = run(args.input, args.output, args.chunk_size, args.workers, args.monthly)
+    print(f"Scored {rows:,} scenarios -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
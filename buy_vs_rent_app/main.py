@@ -1,5 +1,12 @@
+import altair as alt
+import numpy as np
+import pandas as pd
 import streamlit as st
-from processing import OptionBuy, OptionRent
+from breakeven import BREAK_EVEN_BOUNDS, find_break_even
+from monthly import monthly_wealth
+from scenarios import calculate_buy, calculate_rent
+from sensitivity import update_delta_grid
+from simulation import RateDistribution, simulate
 
 st.title("Buy vs Rent")
 
@@ -18,6 +25,20 @@ DOWNPAYMENT_DEFAULT_VALUE = int(
     DEFAULT_HOME_PRICE * DOWNPAYMENT_DEFAULT_PERCENTAGE / 100
 )
 
+MAX_SENSITIVITY_STEPS = 200
+
+# name: (label, min, max, default range, scale of the widget value)
+SENSITIVITY_PARAMETERS = {
+    "interest_rate": ("Interest rate (%)", 0.0, 20.0, (2.0, 10.0), 100),
+    "home_growth": ("Home growth per year (%)", -10.0, 20.0, (0.0, 8.0), 100),
+    "rent_growth": ("Rent growth per year (%)", -10.0, 20.0, (0.0, 8.0), 100),
+    "roi_percent": ("ROI per year on downpayment (%)", -10.0, 30.0, (0.0, 12.0), 100),
+    "monthly_rent": ("Rent per month ($)", 0.0, 20_000.0, (1_000.0, 8_000.0), 1),
+    "years_of_owning": ("Years of owning", 1, 30, (1, 30), 1),
+    "tax": ("Tax per year (%)", 0.0, 5.0, (0.0, 3.0), 100),
+    "sell_comission": ("Sell Comission (%)", 0.0, 20.0, (0.0, 10.0), 100),
+}
+
 
 if "home_price" not in st.session_state:
     st.session_state.home_price = DEFAULT_HOME_PRICE
@@ -205,7 +226,7 @@ with col6:
 
 
 # Calculations for scenario 1
-s = OptionBuy(
+s, with_home = calculate_buy(
     home_price=st.session_state.home_price,
     downpayment=st.session_state.downpayment_in_dollars,
     interest_rate=interest_rate,
@@ -218,8 +239,6 @@ s = OptionBuy(
     sell_comission=sell_comission,
 )
 
-with_home = s.calculate()
-
 st.markdown(f"Your monthly mortgage payment: ${int(s.monthly_payment):,}")
 
 total_home_expenses = s.total_interest + s.total_home_extra
@@ -252,6 +271,8 @@ st.bar_chart(s.expenses_info, x="Year", y="Expense", color="Type", stack=True)
 if not full_downpayment:
     st.markdown(f"**Mortgage payments broken down by year:**")
     st.bar_chart(s.mortgage_info, x="Year", y="Payment", color="Type", stack=True)
+    if st.toggle("Show monthly amortization schedule", key="show_schedule"):
+        st.dataframe(s.amortization.schedule(), hide_index=True)
 
 st.header("Scenario 2: rent and invest", divider="gray")
 
@@ -287,15 +308,13 @@ with col9:
     ) / 100
 
 # Calculations for scenario 2
-s_rent = OptionRent(
+total_roi, total_rent, rent_breakdown = calculate_rent(
     monthly_rent=rent,
     rent_growth=rent_growth,
     downpayment=st.session_state.downpayment_in_dollars,
     roi_percent=roi,
     years=years,
 )
-
-total_roi, total_rent, rent_info = s_rent.calculate()
 without_home = total_roi - total_rent
 
 st.markdown(
@@ -308,7 +327,7 @@ st.markdown(
 st.divider()
 
 st.markdown(f"**Rent expenses broken down by year:**")
-st.bar_chart(rent_info, x="Year", y="Rent", stack=False)
+st.bar_chart(rent_breakdown.to_frame(), x="Year", y="Rent", stack=False)
 
 st.header("Conclusion", divider="gray")
 
@@ -345,3 +364,217 @@ else:
         f"**Per month: {int(delta / years / 12):,}**<br>",
         unsafe_allow_html=True,
     )
+
+st.header("Break-even point", divider="gray")
+
+scenario = {
+    "home_price": st.session_state.home_price,
+    "downpayment": st.session_state.downpayment_in_dollars,
+    "interest_rate": interest_rate,
+    "loan_length": loan_length,
+    "tax": tax,
+    "maintenance": home_maintenance_percent,
+    "monthly_hoa": hoa,
+    "home_growth": home_growth,
+    "years_of_owning": years,
+    "sell_comission": sell_comission,
+    "monthly_rent": rent,
+    "rent_growth": rent_growth,
+    "roi_percent": roi,
+}
+
+break_even_labels = {
+    "monthly_rent": ("Rent per month", lambda value: f"${int(value):,}"),
+    "home_growth": ("Home growth per year", lambda value: f"{value * 100:.2f}%"),
+    "roi_percent": ("ROI per year on downpayment", lambda value: f"{value * 100:.2f}%"),
+    "years_of_owning": ("Years of owning", lambda value: f"{value} years"),
+}
+
+st.markdown(
+    "Value of each parameter at which buying and renting are equally profitable, "
+    "with all other inputs kept as above:"
+)
+for parameter in BREAK_EVEN_BOUNDS:
+    label, formatter = break_even_labels[parameter]
+    break_even = find_break_even(scenario, parameter)
+    if break_even is None:
+        st.markdown(f"**{label}:** no break-even point in the supported range")
+    else:
+        st.markdown(
+            f"**{label}:** {formatter(break_even)} "
+            f"(currently {formatter(scenario[parameter])})"
+        )
+
+st.header("Monte Carlo simulation", divider="gray")
+
+st.markdown(
+    "Home growth, rent growth and ROI are drawn at random every year around the "
+    "values above. The chart shows the percentile bands of the difference between "
+    "buying and renting after each year."
+)
+
+if st.toggle("Run simulation", key="run_simulation"):
+    col10, col11, col12 = st.columns(3)
+
+    with col10:
+        home_growth_volatility = st.number_input(
+            label="Home growth volatility (%)",
+            min_value=0.0,
+            max_value=100.0,
+            value=5.0,
+            step=0.5,
+            key="home_growth_volatility",
+        ) / 100
+        distribution_kind = st.selectbox(
+            "Distribution", RateDistribution.KINDS, key="distribution_kind"
+        )
+    with col11:
+        rent_growth_volatility = st.number_input(
+            label="Rent growth volatility (%)",
+            min_value=0.0,
+            max_value=100.0,
+            value=2.0,
+            step=0.5,
+            key="rent_growth_volatility",
+        ) / 100
+        n_paths = st.number_input(
+            label="Number of paths",
+            min_value=1_000,
+            max_value=100_000,
+            value=10_000,
+            step=1_000,
+            key="n_paths",
+        )
+    with col12:
+        roi_volatility = st.number_input(
+            label="ROI volatility (%)",
+            min_value=0.0,
+            max_value=100.0,
+            value=15.0,
+            step=1.0,
+            key="roi_volatility",
+        ) / 100
+        simulation_seed = st.number_input(
+            label="Random seed",
+            min_value=0,
+            max_value=MAX_INT_VALUE,
+            value=0,
+            step=1,
+            key="simulation_seed",
+        )
+
+    simulation = simulate(
+        scenario,
+        home_growth=RateDistribution(home_growth, home_growth_volatility, distribution_kind),
+        rent_growth=RateDistribution(rent_growth, rent_growth_volatility, distribution_kind),
+        roi_percent=RateDistribution(roi, roi_volatility, distribution_kind),
+        n_paths=n_paths,
+        seed=simulation_seed,
+    )
+    buy_probability = simulation.pop("P(buy beats rent)")
+
+    st.markdown(
+        f"**Probability that buying beats renting over {years} years: "
+        f"{buy_probability[-1] * 100:.1f}%**"
+    )
+    st.line_chart(simulation, x="Year")
+
+st.header("Sensitivity", divider="gray")
+
+st.markdown(
+    "Difference between buying and renting over a grid of two inputs, "
+    "with all other inputs kept as above. Blue cells favor buying, red cells favor renting."
+)
+
+
+def sensitivity_axis(column, axis: str, default_index: int) -> [str, np.ndarray]:
+    with column:
+        parameter = st.selectbox(
+            f"{axis} axis",
+            list(SENSITIVITY_PARAMETERS),
+            index=default_index,
+            format_func=lambda name: SENSITIVITY_PARAMETERS[name][0],
+            key=f"sensitivity_{axis}_parameter",
+        )
+        label, min_value, max_value, default_range, scale = SENSITIVITY_PARAMETERS[
+            parameter
+        ]
+        low, high = st.slider(
+            label,
+            min_value=min_value,
+            max_value=max_value,
+            value=default_range,
+            key=f"sensitivity_{axis}_range_{parameter}",
+        )
+        steps = st.slider(
+            "Steps",
+            min_value=2,
+            max_value=MAX_SENSITIVITY_STEPS,
+            value=50,
+            key=f"sensitivity_{axis}_steps",
+        )
+    values = np.linspace(low, high, steps) / scale
+    if parameter == "years_of_owning":
+        values = np.unique(np.round(values))
+    return parameter, values
+
+
+col13, col14 = st.columns(2)
+x_parameter, x_values = sensitivity_axis(col13, "X", 0)
+y_parameter, y_values = sensitivity_axis(col14, "Y", 1)
+
+if x_parameter == y_parameter:
+    st.write("Please choose two different inputs")
+else:
+    st.session_state.sensitivity_grid = update_delta_grid(
+        st.session_state.get("sensitivity_grid"),
+        scenario,
+        x_parameter,
+        x_values,
+        y_parameter,
+        y_values,
+    )
+    x_scale = SENSITIVITY_PARAMETERS[x_parameter][4]
+    y_scale = SENSITIVITY_PARAMETERS[y_parameter][4]
+    heatmap = pd.DataFrame(
+        {
+            "x": np.tile(x_values * x_scale, y_values.size),
+            "y": np.repeat(y_values * y_scale, x_values.size),
+            "delta": st.session_state.sensitivity_grid["delta"].ravel(),
+        }
+    )
+    chart = (
+        alt.Chart(heatmap)
+        .mark_rect()
+        .encode(
+            x=alt.X("x:O", title=SENSITIVITY_PARAMETERS[x_parameter][0],
+                    axis=alt.Axis(format=".4~g", labelOverlap=True)),
+            y=alt.Y("y:O", title=SENSITIVITY_PARAMETERS[y_parameter][0],
+                    sort="descending",
+                    axis=alt.Axis(format=".4~g", labelOverlap=True)),
+            color=alt.Color("delta:Q", title="Buy - Rent",
+                            scale=alt.Scale(scheme="redblue", domainMid=0)),
+            tooltip=["x", "y", alt.Tooltip("delta:Q", format=",.0f")],
+        )
+    )
+    st.altair_chart(chart, use_container_width=True)
+
+st.header("Monthly model with reinvestment", divider="gray")
+
+st.markdown(
+    "Both options start with the downpayment and spend the same amount every month. "
+    "Whoever pays less in a month invests the difference with the ROI above, "
+    "compounded monthly."
+)
+
+monthly = monthly_wealth(scenario)
+
+st.markdown(
+    f"**Owner's wealth after {years} years (home equity + investments): "
+    f"{int(monthly['owner_wealth']):,}**<br>"
+    f"**Renter's wealth after {years} years (investments): "
+    f"{int(monthly['renter_wealth']):,}**<br>"
+    f"**=> It's better to {'buy' if monthly['delta'] >= 0 else 'rent'} "
+    f"by {int(abs(monthly['delta'])):,}**",
+    unsafe_allow_html=True,
+)
@@ -0,0 +1,83 @@
+import numpy as np
+
+from amortization import monthly_payment, remaining_balance
+
+SCENARIO_PARAMETERS = [
+    "home_price",
+    "downpayment",
+    "interest_rate",
+    "loan_length",
+    "tax",
+    "maintenance",
+    "monthly_hoa",
+    "home_growth",
+    "years_of_owning",
+    "sell_comission",
+    "monthly_rent",
+    "rent_growth",
+    "roi_percent",
+]
+
+
+def monthly_wealth(scenario: dict, reinvest: bool = True) -> dict:
+    """Owner and renter wealth at the end of the horizon, month by month.
+
+    Both sides start with the downpayment and spend the same monthly budget:
+    whoever has the lower cost in a month invests the difference at the
+    monthly equivalent of roi_percent. Rent, tax, maintenance and HOA change
+    once per year as in OptionBuy/OptionRent. Scenario values may be arrays;
+    they are broadcast and the months form an extra trailing axis.
+
+    With reinvest=False the differences are kept as cash, and delta equals
+    with_home - without_home of the yearly model.
+    """
+    values = np.broadcast_arrays(
+        *[np.asarray(scenario[name], dtype=float) for name in SCENARIO_PARAMETERS]
+    )
+    p = dict(zip(SCENARIO_PARAMETERS, values))
+
+    years = p["years_of_owning"].astype(int)
+    horizon = 12 * years
+    month = np.arange(int(horizon.max(initial=0)))
+    year = month // 12
+    active = month < horizon[..., None]
+
+    def expand(value: np.ndarray) -> np.ndarray:
+        return value[..., None]
+
+    loan_amount = p["home_price"] - p["downpayment"]
+    monthly_rate = p["interest_rate"] / 12
+    term_months = np.where(loan_amount > 0, np.round(p["loan_length"] * 12), 0)
+    payment = monthly_payment(loan_amount, monthly_rate, term_months)
+
+    home_growth = (1.0 + expand(p["home_growth"])) ** year
+    owner_cost = (
+        expand(p["home_price"] * (p["tax"] + p["maintenance"]) / 12 + p["monthly_hoa"])
+        * home_growth
+        + np.where(month < expand(term_months), expand(payment), 0.0)
+    )
+    renter_cost = expand(p["monthly_rent"]) * (1.0 + expand(p["rent_growth"])) ** year
+    difference = np.where(active, owner_cost - renter_cost, 0.0)
+
+    if reinvest:
+        monthly_roi = (1.0 + p["roi_percent"]) ** (1 / 12) - 1.0
+        months_left = np.maximum(expand(horizon) - month, 0)
+        growth_to_end = (1.0 + expand(monthly_roi)) ** months_left
+    else:
+        growth_to_end = 1.0
+
+    renter_savings = (np.maximum(difference, 0.0) * growth_to_end).sum(axis=-1)
+    owner_savings = (np.maximum(-difference, 0.0) * growth_to_end).sum(axis=-1)
+
+    balance = remaining_balance(loan_amount, monthly_rate, payment, term_months, horizon)
+    sell_home_price = p["home_price"] * (1.0 + p["home_growth"]) ** years
+    owner_wealth = sell_home_price * (1 - p["sell_comission"]) - balance + owner_savings
+    renter_wealth = (
+        p["downpayment"] * (1.0 + p["roi_percent"]) ** years + renter_savings
+    )
+
+    return {
+        "owner_wealth": owner_wealth,
+        "renter_wealth": renter_wealth,
+        "delta": owner_wealth - renter_wealth,
+    }
@@ -1,4 +1,8 @@
-import collections
+import numpy as np
+import pandas as pd
+
+from amortization import Amortization
+from breakdown import Breakdown
 
 
 class OptionBuy:
@@ -30,69 +34,48 @@ class OptionBuy:
         self._update_mortgage()
 
     def _update_mortgage(self):
-        self.monthly_interest_rate = self.interest_rate / 12
-        monthly_interest_amount = self.monthly_interest_rate * self.loan_amount
-        gamma = (1 + self.monthly_interest_rate) ** (-self.loan_length * 12)
-        self.monthly_payment = monthly_interest_amount / (1 - gamma)
+        self.amortization = Amortization(
+            self.loan_amount, self.interest_rate, self.loan_length
+        )
+        self.monthly_interest_rate = self.amortization.monthly_interest_rate
+        self.monthly_payment = self.amortization.monthly_payment
 
     def _calculate_home_extras(self):
-        def add_expense(expense: float, expense_type: str, year: int):
-            expenses_info["Expense"].append(expense)
-            expenses_info["Type"].append(expense_type)
-            expenses_info["Year"].append(year)
+        growth = (1.0 + self.home_growth) ** np.arange(self.years_of_owning)
 
-        expenses_info = collections.defaultdict(list)
+        expenses = Breakdown("Expense", ["Tax", "Maintenance", "HOA"], self.years_of_owning)
+        expenses.set("Tax", self.home_price * self.tax * growth)
+        expenses.set("Maintenance", self.home_price * self.maintenance * growth)
+        expenses.set("HOA", 12 * self.monthly_hoa * growth)
 
-        tax_yearly = self.home_price * self.tax
-        maintenance_yearly = self.home_price * self.maintenance
-        hoa_yearly = 12 * self.monthly_hoa
+        self.total_tax = float(expenses.get("Tax").sum())
+        self.total_maintenance = float(expenses.get("Maintenance").sum())
+        self.total_hoa = float(expenses.get("HOA").sum())
 
-        self.total_tax = 0.0
-        self.total_maintenance = 0.0
-        self.total_hoa = 0.0
+        self.total_home_extra = self.total_tax + self.total_maintenance + self.total_hoa
+        self.expenses_breakdown = expenses
 
-        for year in range(self.years_of_owning):
-            self.total_tax += tax_yearly
-            self.total_maintenance += maintenance_yearly
-            self.total_hoa += hoa_yearly
+        return self.total_home_extra
 
-            add_expense(tax_yearly, "Tax", year + 1)
-            add_expense(maintenance_yearly, "Maintenance", year + 1)
-            add_expense(hoa_yearly, "HOA", year + 1)
+    def _calculate_mortgage(self):
+        principal, interest = self.amortization.yearly_totals(self.years_of_owning)
 
-            tax_yearly *= 1.0 + self.home_growth
-            maintenance_yearly *= 1.0 + self.home_growth
-            hoa_yearly *= 1.0 + self.home_growth
+        payments = Breakdown("Payment", ["Principal", "Interest"], self.years_of_owning)
+        payments.set("Principal", principal)
+        payments.set("Interest", interest)
 
-        self.total_home_extra = self.total_tax + self.total_maintenance + self.total_hoa
-        self.expenses_info = expenses_info
+        self.total_interest = self.amortization.interest_paid(
+            0, 12 * self.years_of_owning
+        )
+        self.mortgage_breakdown = payments
 
-        return self.total_home_extra
+    @property
+    def expenses_info(self) -> pd.DataFrame:
+        return self.expenses_breakdown.to_frame()
 
-    def _calculate_mortgage(self):
-        def add_payment(payment: float, payment_type: str, year: int):
-            mortgage_info["Payment"].append(payment)
-            mortgage_info["Type"].append(payment_type)
-            mortgage_info["Year"].append(year)
-
-        mortgage_info = collections.defaultdict(list)
-
-        loan = self.loan_amount
-        self.total_interest = 0.0
-        for year in range(self.years_of_owning):
-            year_principal, year_interest = 0.0, 0.0
-            for month in range(12):
-                monthly_interest = self.monthly_interest_rate * loan
-                monthly_principal = self.monthly_payment - monthly_interest
-                loan -= monthly_principal
-                self.total_interest += monthly_interest
-                year_interest += monthly_interest
-                year_principal += monthly_principal
-
-            add_payment(year_principal, "Principal", year + 1)
-            add_payment(year_interest, "Interest", year + 1)
-
-        self.mortgage_info = mortgage_info
+    @property
+    def mortgage_info(self) -> pd.DataFrame:
+        return self.mortgage_breakdown.to_frame()
 
     def _calculate_home_sell(self):
         home_growth = (1.0 + self.home_growth) ** (self.years_of_owning)
@@ -126,21 +109,16 @@ class OptionRent:
         self.roi_percent = roi_percent
         self.years = years
 
-    def calculate(self) -> [float, float]:
+    def calculate(self) -> [float, float, Breakdown]:
         total_roi = (
             self.downpayment * (1 + self.roi_percent) ** (self.years) - self.downpayment
         )
 
-        total_rent = 0.0
-        monthly_rent = self.monthly_rent
-
-        rent_info = collections.defaultdict(list)
-
-        for year in range(self.years):
-            rent_yearly = monthly_rent * 12
-            total_rent += rent_yearly
-            rent_info["Year"].append(year + 1)
-            rent_info["Rent"].append(rent_yearly)
-            monthly_rent *= 1.0 + self.rent_growth
+        rent = Breakdown("Rent", ["Rent"], self.years)
+        rent.set(
+            "Rent",
+            12 * self.monthly_rent * (1.0 + self.rent_growth) ** np.arange(self.years),
+        )
+        total_rent = float(rent.values.sum())
 
-        return total_roi, total_rent, rent_info
+        return total_roi, total_rent, rent
@@ -0,0 +1,67 @@
+import streamlit as st
+
+from breakdown import Breakdown
+from processing import OptionBuy, OptionRent
+
+# results are shared by all sessions of the server process
+CACHE_MAX_ENTRIES = 1024
+
+
+def _normalize(value: float) -> float:
+    # 850000, 850000.0 and 0.1 + 0.2 vs 0.3 must map to the same cache key
+    return round(float(value), 10)
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _calculate_buy(key: tuple) -> [OptionBuy, float]:
+    option = OptionBuy(*key)
+    return option, option.calculate()
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _calculate_rent(key: tuple) -> [float, float, Breakdown]:
+    return OptionRent(*key).calculate()
+
+
+def calculate_buy(
+    home_price: float,
+    downpayment: float,
+    interest_rate: float,
+    loan_length: float,
+    tax: float,
+    maintenance: float,
+    monthly_hoa: float,
+    home_growth: float,
+    years_of_owning: int,
+    sell_comission: float,
+) -> [OptionBuy, float]:
+    key = (
+        _normalize(home_price),
+        _normalize(downpayment),
+        _normalize(interest_rate),
+        _normalize(loan_length),
+        _normalize(tax),
+        _normalize(maintenance),
+        _normalize(monthly_hoa),
+        _normalize(home_growth),
+        int(years_of_owning),
+        _normalize(sell_comission),
+    )
+    return _calculate_buy(key)
+
+
+def calculate_rent(
+    monthly_rent: float,
+    rent_growth: float,
+    downpayment: float,
+    roi_percent: float,
+    years: int,
+) -> [float, float, Breakdown]:
+    key = (
+        _normalize(monthly_rent),
+        _normalize(rent_growth),
+        _normalize(downpayment),
+        _normalize(roi_percent),
+        int(years),
+    )
+    return _calculate_rent(key)
@@ -0,0 +1,91 @@
+from typing import Optional
+
+import numpy as np
+
+from breakeven import scenario_delta
+
+
+def delta_grid(
+    scenario: dict,
+    x_parameter: str,
+    x_values: np.ndarray,
+    y_parameter: str,
+    y_values: np.ndarray,
+) -> np.ndarray:
+    # with_home - without_home of shape (len(y_values), len(x_values))
+    return scenario_delta(
+        {
+            **scenario,
+            x_parameter: np.asarray(x_values)[None, :],
+            y_parameter: np.asarray(y_values)[:, None],
+        }
+    )
+
+
+def _match(old_values: np.ndarray, new_values: np.ndarray) -> np.ndarray:
+    # position of each new value in old_values, or -1 if it was not computed
+    if old_values.size == 0:
+        return np.full(new_values.size, -1)
+    position = np.clip(np.searchsorted(old_values, new_values), 1, old_values.size - 1)
+    left, right = old_values[position - 1], old_values[position]
+    position -= np.abs(new_values - left) <= np.abs(new_values - right)
+    found = np.isclose(old_values[position], new_values, rtol=1e-12, atol=0.0)
+    return np.where(found, position, -1)
+
+
+def update_delta_grid(
+    previous: Optional[dict],
+    scenario: dict,
+    x_parameter: str,
+    x_values: np.ndarray,
+    y_parameter: str,
+    y_values: np.ndarray,
+) -> dict:
+    """Delta grid over two parameters, reusing cells of a previous grid.
+
+    If only the axis values changed since `previous` was computed, cells
+    whose x and y values were already present are copied over and only the
+    new rows and columns are evaluated. Axis values must be sorted.
+    """
+    x_values, y_values = np.asarray(x_values), np.asarray(y_values)
+    fixed = {
+        name: value
+        for name, value in scenario.items()
+        if name not in (x_parameter, y_parameter)
+    }
+    grid = {
+        "fixed": fixed,
+        "x_parameter": x_parameter,
+        "x_values": x_values,
+        "y_parameter": y_parameter,
+        "y_values": y_values,
+    }
+
+    if (
+        previous is None
+        or previous["fixed"] != fixed
+        or previous["x_parameter"] != x_parameter
+        or previous["y_parameter"] != y_parameter
+    ):
+        grid["delta"] = delta_grid(scenario, x_parameter, x_values, y_parameter, y_values)
+        return grid
+
+    x_index = _match(previous["x_values"], x_values)
+    y_index = _match(previous["y_values"], y_values)
+    x_known, y_known = x_index >= 0, y_index >= 0
+
+    delta = np.empty((y_values.size, x_values.size))
+    delta[np.ix_(y_known, x_known)] = previous["delta"][
+        np.ix_(y_index[y_known], x_index[x_known])
+    ]
+    if not x_known.all():
+        delta[:, ~x_known] = delta_grid(
+            scenario, x_parameter, x_values[~x_known], y_parameter, y_values
+        )
+    if not y_known.all():
+        delta[np.ix_(~y_known, x_known)] = delta_grid(
+            scenario, x_parameter, x_values[x_known], y_parameter, y_values[~y_known]
+        )
+
+    grid["delta"] = delta
+    return grid
@@ -0,0 +1,174 @@
+import numpy as np
+
+from amortization import interest_paid, monthly_payment
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+DEFAULT_CHUNK_SIZE = 10_000
+DEFAULT_SKETCH_SIZE = 1024
+
+
+class RateDistribution:
+    """Distribution of a yearly rate with the given mean and volatility.
+
+    "normal" draws the rate itself from a normal distribution, "lognormal"
+    draws the growth factor (1 + rate) so that it can never go below zero.
+    """
+
+    KINDS = ("normal", "lognormal")
+
+    def __init__(self, mean: float, volatility: float, kind: str = "normal"):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown distribution kind: {kind}")
+
+        self.mean = mean
+        self.volatility = volatility
+        self.kind = kind
+
+    def sample(self, rng: np.random.Generator, shape: tuple) -> np.ndarray:
+        if self.kind == "normal":
+            return self.mean + self.volatility * rng.standard_normal(shape)
+
+        sigma2 = np.log1p((self.volatility / (1.0 + self.mean)) ** 2)
+        mu = np.log1p(self.mean) - sigma2 / 2
+        return np.exp(mu + np.sqrt(sigma2) * rng.standard_normal(shape)) - 1.0
+
+
+class QuantileSketch:
+    """Bounded-size, mergeable summary of the distribution of each column.
+
+    Samples are folded in chunk by chunk and compressed into at most `size`
+    weighted centroids per column, so memory does not grow with the number
+    of samples.
+    """
+
+    def __init__(self, columns: int, size: int = DEFAULT_SKETCH_SIZE):
+        self.size = size
+        self.values = np.empty((columns, 0))
+        self.weights = np.empty((columns, 0))
+
+    def update(self, samples: np.ndarray):
+        # samples: (n, columns)
+        values = np.concatenate([self.values, samples.T], axis=1)
+        weights = np.concatenate([self.weights, np.ones_like(samples.T)], axis=1)
+
+        order = np.argsort(values, axis=1, kind="stable")
+        values = np.take_along_axis(values, order, axis=1)
+        weights = np.take_along_axis(weights, order, axis=1)
+
+        if values.shape[1] > self.size:
+            values, weights = self._compress(values, weights)
+
+        self.values, self.weights = values, weights
+
+    def _compress(self, values: np.ndarray, weights: np.ndarray) -> tuple:
+        columns = values.shape[0]
+        cumulative = np.cumsum(weights, axis=1)
+        rank = (cumulative - weights / 2) / cumulative[:, -1:]
+        bucket = np.minimum((rank * self.size).astype(int), self.size - 1)
+        bucket += np.arange(columns)[:, None] * self.size
+
+        length = columns * self.size
+        bucket_weights = np.bincount(bucket.ravel(), weights.ravel(), length)
+        bucket_sums = np.bincount(bucket.ravel(), (weights * values).ravel(), length)
+        bucket_weights = bucket_weights.reshape(columns, self.size)
+        bucket_sums = bucket_sums.reshape(columns, self.size)
+
+        # empty buckets keep zero weight and repeat the previous centroid
+        filled = bucket_weights > 0
+        source = np.maximum.accumulate(
+            np.where(filled, np.arange(self.size), 0), axis=1
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            centroids = bucket_sums / bucket_weights
+        centroids = np.take_along_axis(centroids, source, axis=1)
+        return centroids, bucket_weights
+
+    def quantiles(self, q) -> np.ndarray:
+        # returns an array of shape (len(q), columns)
+        q = np.atleast_1d(np.asarray(q, dtype=float))
+        result = np.empty((q.size, self.values.shape[0]))
+        for column, (values, weights) in enumerate(zip(self.values, self.weights)):
+            cumulative = np.cumsum(weights) - weights / 2
+            result[:, column] = np.interp(q * weights.sum(), cumulative, values)
+        return result
+
+
+def _cumulative_growth(rates: np.ndarray) -> np.ndarray:
+    # growth factor at the start of each year: 1, (1 + r0), (1 + r0)(1 + r1), ...
+    growth = np.ones((rates.shape[0], rates.shape[1] + 1))
+    np.cumprod(1.0 + rates, axis=1, out=growth[:, 1:])
+    return growth
+
+
+def _yearly_delta(
+    scenario: dict,
+    home_growth: np.ndarray,
+    rent_growth: np.ndarray,
+    roi_percent: np.ndarray,
+    interest: np.ndarray,
+) -> np.ndarray:
+    # with_home - without_home after each year of the horizon, shape (paths, years)
+    home_value = scenario["home_price"] * _cumulative_growth(home_growth)
+    yearly_extras = home_value[:, :-1] * (
+        scenario["tax"] + scenario["maintenance"]
+    ) + 12 * scenario["monthly_hoa"] * (home_value[:, :-1] / scenario["home_price"])
+    home_delta = (
+        home_value[:, 1:] * (1 - scenario["sell_comission"]) - scenario["home_price"]
+    )
+    with_home = home_delta - np.cumsum(yearly_extras, axis=1) - interest
+
+    yearly_rent = 12 * scenario["monthly_rent"] * _cumulative_growth(rent_growth)[:, :-1]
+    total_roi = scenario["downpayment"] * (_cumulative_growth(roi_percent)[:, 1:] - 1)
+    without_home = total_roi - np.cumsum(yearly_rent, axis=1)
+
+    return with_home - without_home
+
+
+def simulate(
+    scenario: dict,
+    home_growth: RateDistribution,
+    rent_growth: RateDistribution,
+    roi_percent: RateDistribution,
+    n_paths: int = 100_000,
+    seed: int = 0,
+    percentiles: tuple = DEFAULT_PERCENTILES,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> dict:
+    """Monte Carlo comparison of buying vs renting with random yearly rates.
+
+    `scenario` holds the same inputs as breakeven.scenario_delta; the yearly
+    home growth, rent growth and ROI are drawn from the given distributions
+    instead. Returns one row per year of the horizon with the percentile
+    bands of delta and the probability that buying beats renting.
+    """
+    years = int(scenario["years_of_owning"])
+    rng = np.random.default_rng(seed)
+
+    loan_amount = scenario["home_price"] - scenario["downpayment"]
+    monthly_rate = scenario["interest_rate"] / 12
+    term_months = round(scenario["loan_length"] * 12) if loan_amount > 0 else 0
+    payment = monthly_payment(loan_amount, monthly_rate, term_months)
+    interest = interest_paid(
+        loan_amount, monthly_rate, payment, term_months, 0, 12 * np.arange(1, years + 1)
+    )
+
+    sketch = QuantileSketch(years)
+    buy_wins = np.zeros(years)
+    for start in range(0, n_paths, chunk_size):
+        shape = (min(chunk_size, n_paths - start), years)
+        delta = _yearly_delta(
+            scenario,
+            home_growth.sample(rng, shape),
+            rent_growth.sample(rng, shape),
+            roi_percent.sample(rng, shape),
+            interest,
+        )
+        sketch.update(delta)
+        buy_wins += (delta > 0).sum(axis=0)
+
+    bands = sketch.quantiles(np.asarray(percentiles) / 100)
+    result = {"Year": np.arange(1, years + 1)}
+    for percentile, band in zip(percentiles, bands):
+        result[f"P{percentile}"] = band
+    result["P(buy beats rent)"] = buy_wins / n_paths
+    return result
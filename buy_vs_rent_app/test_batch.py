@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from batch import BatchOptionBuy, BatchOptionRent
+from breakeven import BUY_PARAMETERS
+from processing import OptionBuy, OptionRent
+
+SCENARIOS = 200
+SEED = 1
+
+
+def random_scenarios(size: int = SCENARIOS, seed: int = SEED) -> dict:
+    rng = np.random.default_rng(seed)
+    home_price = rng.uniform(100_000, 2_000_000, size)
+    scenarios = {
+        "home_price": home_price,
+        "downpayment": home_price * rng.uniform(0.05, 1.0, size),
+        "interest_rate": rng.uniform(0.0, 0.12, size),
+        "loan_length": rng.integers(5, 41, size).astype(float),
+        "tax": rng.uniform(0.0, 0.03, size),
+        "maintenance": rng.uniform(0.0, 0.02, size),
+        "monthly_hoa": rng.uniform(0.0, 800, size),
+        "home_growth": rng.uniform(-0.05, 0.1, size),
+        "years_of_owning": rng.integers(1, 41, size).astype(float),
+        "sell_comission": rng.uniform(0.0, 0.1, size),
+        "monthly_rent": rng.uniform(500, 10_000, size),
+        "rent_growth": rng.uniform(-0.02, 0.08, size),
+        "roi_percent": rng.uniform(-0.02, 0.12, size),
+    }
+    # no loan at all, and an interest rate of exactly zero
+    scenarios["downpayment"][0] = scenarios["home_price"][0]
+    scenarios["interest_rate"][1] = 0.0
+    return scenarios
+
+
+def option_buy(scenarios: dict, row: int) -> OptionBuy:
+    arguments = {name: float(scenarios[name][row]) for name in BUY_PARAMETERS}
+    arguments["years_of_owning"] = int(arguments["years_of_owning"])
+    return OptionBuy(**arguments)
+
+
+def option_rent(scenarios: dict, row: int) -> OptionRent:
+    return OptionRent(
+        monthly_rent=float(scenarios["monthly_rent"][row]),
+        rent_growth=float(scenarios["rent_growth"][row]),
+        downpayment=float(scenarios["downpayment"][row]),
+        roi_percent=float(scenarios["roi_percent"][row]),
+        years=int(scenarios["years_of_owning"][row]),
+    )
+
+
+def test_batch_buy_matches_option_buy():
+    scenarios = random_scenarios()
+    batch = BatchOptionBuy(**{name: scenarios[name] for name in BUY_PARAMETERS})
+    profits = batch.calculate()
+
+    for row in range(SCENARIOS):
+        option = option_buy(scenarios, row)
+        assert profits[row] == pytest.approx(option.calculate(), rel=1e-9)
+        assert batch.total_interest[row] == pytest.approx(option.total_interest, rel=1e-9, abs=1e-6)
+        assert batch.total_home_extra[row] == pytest.approx(option.total_home_extra, rel=1e-9)
+
+
+def test_batch_rent_matches_option_rent():
+    scenarios = random_scenarios()
+    total_roi, total_rent = BatchOptionRent(
+        monthly_rent=scenarios["monthly_rent"],
+        rent_growth=scenarios["rent_growth"],
+        downpayment=scenarios["downpayment"],
+        roi_percent=scenarios["roi_percent"],
+        years=scenarios["years_of_owning"],
+    ).calculate()
+
+    for row in range(SCENARIOS):
+        roi, rent, _ = option_rent(scenarios, row).calculate()
+        assert total_roi[row] == pytest.approx(roi, rel=1e-9)
+        assert total_rent[row] == pytest.approx(rent, rel=1e-9)
+
+
+def test_batch_buy_yearly_breakdown_matches_option_buy():
+    scenarios = random_scenarios(size=20)
+    breakdown = BatchOptionBuy(
+        **{name: scenarios[name] for name in BUY_PARAMETERS}
+    ).yearly_breakdown()
+
+    for row in range(20):
+        option = option_buy(scenarios, row)
+        option.calculate()
+        years = option.years_of_owning
+        for name in ["Tax", "Maintenance", "HOA"]:
+            np.testing.assert_allclose(
+                breakdown[name][row, :years], option.expenses_breakdown.get(name), rtol=1e-9
+            )
+        for name in ["Principal", "Interest"]:
+            np.testing.assert_allclose(
+                breakdown[name][row, :years],
+                option.mortgage_breakdown.get(name),
+                rtol=1e-9,
+                atol=1e-6,
+            )
@@ -0,0 +1,25 @@
+import numpy as np
+
+from breakeven import scenario_delta
+from monthly import monthly_wealth
+from test_batch import random_scenarios
+
+
+def test_monthly_without_reinvesting_matches_yearly_model():
+    scenarios = random_scenarios()
+    np.testing.assert_allclose(
+        monthly_wealth(scenarios, reinvest=False)["delta"], scenario_delta(scenarios), rtol=1e-6
+    )
+
+
+def test_monthly_reinvesting_helps_the_side_that_saves():
+    scenarios = random_scenarios()
+    reinvested = monthly_wealth(scenarios)
+    kept = monthly_wealth(scenarios, reinvest=False)
+    roi_positive = scenarios["roi_percent"] > 0
+    assert np.all(
+        reinvested["renter_wealth"][roi_positive] >= kept["renter_wealth"][roi_positive] - 1e-6
+    )
+    assert np.all(
+        reinvested["owner_wealth"][roi_positive] >= kept["owner_wealth"][roi_positive] - 1e-6
+    )